@@ -0,0 +1 @@
+"""Benchmark riproducibili della pipeline di conversione"""
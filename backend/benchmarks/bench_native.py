@@ -0,0 +1,93 @@
+"""
+Benchmark della scalabilità dell'estrazione di testo nativo sui core
+
+Confronta l'estrazione sequenziale con quella parallela a processi per un
+numero crescente di worker e riporta speedup ed efficienza.
+
+Uso (dalla cartella backend):
+    python -m benchmarks.bench_native --pages 600 --workers 1,2,4,8
+    python -m benchmarks.bench_native --backend pdfium --pages 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import compare_results, report_regressions, save_results
+from benchmarks.fixtures import build_fixture
+
+async def _measure(pdf_path: str, workers: List[int], backend_name: str) -> List[Dict[str, Any]]:
+    from src.pdf_processor import PDFProcessor
+    from src.text_backends import get_text_backend
+
+    backend = get_text_backend(backend_name)
+    processor = PDFProcessor(max_workers=1)
+    try:
+        page_count = processor.rasterizer.page_count(pdf_path)
+        started = time.perf_counter()
+        reference = await processor._extract_native_serial(pdf_path, page_count, backend)
+        serial = time.perf_counter() - started
+    finally:
+        processor.shutdown()
+
+    results = [{'workers': 'serial', 'seconds': serial, 'speedup': 1.0, 'matches_serial': True}]
+    for count in workers:
+        processor = PDFProcessor(max_workers=count)
+        try:
+            # Primo passaggio fuori misura: avvio dei processi e import nei worker
+            await processor._extract_native_parallel(pdf_path, page_count, backend)
+            started = time.perf_counter()
+            page_texts = await processor._extract_native_parallel(pdf_path, page_count, backend)
+            seconds = time.perf_counter() - started
+        finally:
+            processor.shutdown()
+
+        results.append({
+            'workers': count,
+            'seconds': seconds,
+            'speedup': serial / seconds if seconds > 0 else None,
+            'matches_serial': page_texts == reference,
+        })
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scalabilità dell'estrazione nativa su più processi")
+    parser.add_argument('--pages', type=int, default=200, help="Pagine del fixture nativo")
+    parser.add_argument('--backend', default='pdfplumber', help="Backend di estrazione del testo (pdfium, pdfplumber)")
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)) or '1')
+    parser.add_argument('--output', help="File JSON dei risultati")
+    parser.add_argument('--compare', help="JSON di un run precedente da usare come baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Rallentamento relativo oltre cui segnalare una regressione")
+    args = parser.parse_args()
+
+    pdf_path = build_fixture('native', args.pages)
+    workers = [int(count) for count in args.workers.split(',') if count]
+    runs = asyncio.run(_measure(str(pdf_path), workers, args.backend))
+
+    for run in runs:
+        efficiency = run['speedup'] / run['workers'] if isinstance(run['workers'], int) and run['speedup'] else 1.0
+        print(
+            f"{str(run['workers']):<8} {run['seconds']:8.2f}s  speedup {run['speedup']:5.2f}x  "
+            f"efficienza {efficiency * 100:5.1f}%  output identico: {run['matches_serial']}"
+        )
+
+    result = {
+        'name': f"native_{args.pages}p_{args.backend}",
+        'pages': args.pages,
+        'backend': args.backend,
+        'cpu_count': os.cpu_count(),
+        'timings': {f"workers_{run['workers']}": round(run['seconds'], 4) for run in runs},
+        'runs': runs,
+    }
+    path = save_results('native', [result], args.output)
+    print(f"Risultati salvati in {path}")
+
+    if args.compare:
+        return report_regressions(compare_results(args.compare, [result], args.threshold))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Benchmark delle fasi della pipeline di process_pdf_background
+
+Uso (dalla cartella backend):
+    python -m benchmarks.bench_pipeline --sizes 1,50 --kinds native,scanned,mixed
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/baseline.json
+
+Ogni documento viene elaborato in un processo separato, così il picco di
+memoria (RSS) misurato è quello del solo documento.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks.common import compare_results, peak_rss_mb, report_regressions, save_results
+from benchmarks.fixtures import build_fixture
+
+BENCHMARK_PROFILE = {
+    "id": "base",
+    "name": "DSA Base",
+    "description": "Profilo base per la leggibilità DSA",
+    "font": "Atkinson Hyperlegible",
+    "fontSize": 16,
+    "lineHeight": 1.6,
+    "maxWidth": 68,
+    "textAlign": "left",
+    "backgroundColor": "#F7F3E8",
+    "textColor": "#111111",
+    "paragraphSpacing": 8,
+    "linkColor": "#2563EB"
+}
+
+async def _run_pipeline(pdf_path: str, formats: List[str], ocr_language: str) -> Dict[str, Any]:
+    """Esegue le fasi della pipeline misurandole una per una"""
+    from src.pdf_processor import PDFProcessor
+    from src.text_normalizer import TextNormalizer
+    from src.structure_reconstructor import StructureReconstructor
+    from src.export_manager import ExportManager
+    from src.models import DSAProfile
+
+    pdf_processor = PDFProcessor()
+    text_normalizer = TextNormalizer()
+    structure_reconstructor = StructureReconstructor()
+    export_manager = ExportManager()
+    profile = DSAProfile(**BENCHMARK_PROFILE)
+
+    timings = {}
+    started = time.perf_counter()
+
+    def lap(stage: str, stage_started: float):
+        timings[stage] = round(time.perf_counter() - stage_started, 4)
+
+    try:
+        t = time.perf_counter()
+        pdf_info = await pdf_processor.analyze_pdf(pdf_path)
+        lap('analyze', t)
+
+        t = time.perf_counter()
+        if pdf_info.is_native:
+            text = await pdf_processor.extract_text_native(pdf_path)
+            lap('extract_native', t)
+        else:
+            text = await pdf_processor.extract_text_ocr(pdf_path, language=ocr_language)
+            lap('extract_ocr', t)
+
+        t = time.perf_counter()
+        normalized_text = await text_normalizer.normalize_text(text)
+        lap('normalize', t)
+
+        t = time.perf_counter()
+        structured_content = await structure_reconstructor.reconstruct_structure(normalized_text)
+        lap('structure', t)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            for format_type in formats:
+                t = time.perf_counter()
+                await export_manager.export_document(structured_content, profile, format_type, output_dir, pdf_path)
+                lap(f'export_{format_type}', t)
+
+        timings['total'] = round(time.perf_counter() - started, 4)
+        return {'timings': timings, 'page_count': pdf_info.page_count, 'is_native': pdf_info.is_native, 'error': None}
+
+    except Exception as e:
+        return {'timings': timings, 'page_count': None, 'is_native': None, 'error': str(e)}
+
+    finally:
+        pdf_processor.shutdown()
+
+def _run_in_child(pdf_path: str, formats: List[str], ocr_language: str) -> Dict[str, Any]:
+    """Entry point del processo figlio: pipeline + picco di memoria"""
+    result = asyncio.run(_run_pipeline(pdf_path, formats, ocr_language))
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+def run_fixture(kind: str, pages: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Esegue un fixture `repeat` volte e aggrega i tempi con la mediana"""
+    pdf_path = build_fixture(kind, pages, skew_degrees=args.skew, noise_sigma=args.noise)
+    context = multiprocessing.get_context('spawn')
+
+    runs = []
+    for _ in range(args.repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(_run_in_child, str(pdf_path), args.formats, args.ocr_language).result())
+
+    errors = [run['error'] for run in runs if run['error']]
+    stages = {stage for run in runs for stage in run['timings']}
+    timings = {
+        stage: round(statistics.median(run['timings'][stage] for run in runs if stage in run['timings']), 4)
+        for stage in sorted(stages)
+    }
+    pages_per_second = {
+        stage: round(pages / seconds, 2)
+        for stage, seconds in timings.items() if seconds > 0
+    }
+
+    return {
+        'name': f"{kind}_{pages}p",
+        'kind': kind,
+        'pages': pages,
+        'fixture': pdf_path.name,
+        'is_native': runs[-1]['is_native'],
+        'timings': timings,
+        'pages_per_second': pages_per_second,
+        'peak_rss_mb': max((run['peak_rss_mb'] or 0) for run in runs) or None,
+        'error': errors[0] if errors else None,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark delle fasi della pipeline PDF DSA")
+    parser.add_argument('--kinds', default='native,scanned,mixed', help="Tipi di fixture (native, scanned, mixed)")
+    parser.add_argument('--sizes', default='1,50', help="Numero di pagine dei fixture (es. 1,50,500)")
+    parser.add_argument('--formats', default='docx,pdf,epub', help="Formati di export da misurare")
+    parser.add_argument('--ocr-language', default='ita+eng')
+    parser.add_argument('--skew', type=float, default=1.5, help="Inclinazione massima delle pagine scannerizzate (gradi)")
+    parser.add_argument('--noise', type=float, default=12.0, help="Deviazione standard del rumore gaussiano")
+    parser.add_argument('--repeat', type=int, default=1, help="Ripetizioni per fixture (si usa la mediana)")
+    parser.add_argument('--output', help="File JSON dei risultati")
+    parser.add_argument('--compare', help="JSON di un run precedente da usare come baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Rallentamento relativo oltre cui segnalare una regressione")
+    args = parser.parse_args()
+    args.formats = [f for f in args.formats.split(',') if f]
+
+    results = []
+    for kind in [k for k in args.kinds.split(',') if k]:
+        for pages in [int(size) for size in args.sizes.split(',') if size]:
+            result = run_fixture(kind, pages, args)
+            results.append(result)
+            status = f"ERRORE: {result['error']}" if result['error'] else f"{result['timings'].get('total', 0):.2f}s"
+            print(f"{result['name']:<16} {status}  picco RSS {result['peak_rss_mb']} MB")
+            for stage, seconds in result['timings'].items():
+                print(f"    {stage:<16} {seconds:8.3f}s  {result['pages_per_second'].get(stage, 0):8.2f} pag/s")
+
+    path = save_results('pipeline', results, args.output)
+    print(f"Risultati salvati in {path}")
+
+    if args.compare:
+        return report_regressions(compare_results(args.compare, results, args.threshold))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Benchmark dei backend di rasterizzazione (PDFium nel processo vs Poppler/pdftoppm)
+
+Uso (dalla cartella backend):
+    python -m benchmarks.bench_rasterizer --sizes 1,50 --dpi 300
+    python -m benchmarks.bench_rasterizer --backends pdfium --compare benchmarks/results/<baseline>.json
+
+Ogni backend gira in un processo separato: per pagina si misurano latenza,
+sottoprocessi avviati e byte letti (pipe/file), per documento il picco di RSS.
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from benchmarks.common import compare_results, peak_rss_mb, report_regressions, save_results
+from benchmarks.fixtures import build_fixture
+
+def _read_bytes() -> Optional[int]:
+    """Byte letti dal processo (file e pipe), da /proc/self/io dove disponibile"""
+    io_path = Path('/proc/self/io')
+    if not io_path.exists():
+        return None
+    for line in io_path.read_text().splitlines():
+        if line.startswith('rchar:'):
+            return int(line.split()[1])
+    return None
+
+def _render_in_child(pdf_path: str, backend: str, dpi: int) -> Dict[str, Any]:
+    """Entry point del processo figlio: renderizza tutte le pagine con un backend"""
+    import subprocess
+    from src.rasterizer import PageRasterizer
+
+    # Conta i sottoprocessi avviati (pdftoppm per ogni pagina con Poppler)
+    spawned = [0]
+    original_init = subprocess.Popen.__init__
+
+    def counting_init(self, *args, **kwargs):
+        spawned[0] += 1
+        original_init(self, *args, **kwargs)
+
+    subprocess.Popen.__init__ = counting_init
+
+    try:
+        rasterizer = PageRasterizer(backend=backend)
+        page_count = rasterizer.page_count(pdf_path)
+        # La prima pagina fuori misura: esclude import e caricamento delle librerie
+        rasterizer.render_page(pdf_path, 1, dpi)
+
+        spawned[0] = 0
+        read_before = _read_bytes()
+        latencies = []
+        started = time.perf_counter()
+        for page_number in range(1, page_count + 1):
+            page_started = time.perf_counter()
+            image = rasterizer.render_page(pdf_path, page_number, dpi)
+            latencies.append(time.perf_counter() - page_started)
+            del image
+        total = time.perf_counter() - started
+        read_after = _read_bytes()
+
+        return {
+            'page_count': page_count,
+            'total': total,
+            'latencies': latencies,
+            'subprocesses': spawned[0],
+            'read_mb': round((read_after - read_before) / (1024 * 1024), 1) if read_before is not None else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'error': None,
+        }
+
+    except Exception as e:
+        return {'error': str(e)}
+
+    finally:
+        subprocess.Popen.__init__ = original_init
+
+def run_backend(kind: str, pages: int, backend: str, args: argparse.Namespace) -> Dict[str, Any]:
+    pdf_path = build_fixture(kind, pages)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        run = executor.submit(_render_in_child, str(pdf_path), backend, args.dpi).result()
+
+    result: Dict[str, Any] = {
+        'name': f"{kind}_{pages}p_{backend}",
+        'kind': kind,
+        'pages': pages,
+        'backend': backend,
+        'dpi': args.dpi,
+        'error': run['error'],
+        'timings': {},
+    }
+    if run['error']:
+        return result
+
+    latencies = sorted(run['latencies'])
+    result.update(
+        timings={
+            'total': round(run['total'], 4),
+            'page_median': round(statistics.median(latencies), 4),
+            'page_p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+        },
+        pages_per_second=round(run['page_count'] / run['total'], 2) if run['total'] > 0 else None,
+        subprocesses=run['subprocesses'],
+        read_mb=run['read_mb'],
+        peak_rss_mb=run['peak_rss_mb'],
+    )
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dei backend di rasterizzazione")
+    parser.add_argument('--backends', default='pdfium,poppler', help="Backend da confrontare (pdfium, poppler)")
+    parser.add_argument('--kinds', default='scanned', help="Tipi di fixture (native, scanned, mixed)")
+    parser.add_argument('--sizes', default='1,50', help="Numero di pagine dei fixture")
+    parser.add_argument('--dpi', type=int, default=300, help="Risoluzione di rendering")
+    parser.add_argument('--output', help="File JSON dei risultati")
+    parser.add_argument('--compare', help="JSON di un run precedente da usare come baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Rallentamento relativo oltre cui segnalare una regressione")
+    args = parser.parse_args()
+
+    results = []
+    for kind in [k for k in args.kinds.split(',') if k]:
+        for pages in [int(size) for size in args.sizes.split(',') if size]:
+            for backend in [b for b in args.backends.split(',') if b]:
+                result = run_backend(kind, pages, backend, args)
+                results.append(result)
+                if result['error']:
+                    print(f"{result['name']:<24} ERRORE: {result['error']}")
+                    continue
+                timings = result['timings']
+                print(
+                    f"{result['name']:<24} {timings['total']:8.3f}s  "
+                    f"mediana/pag {timings['page_median'] * 1000:7.1f} ms  p95 {timings['page_p95'] * 1000:7.1f} ms  "
+                    f"{result['pages_per_second']:6.2f} pag/s  sottoprocessi {result['subprocesses']}  "
+                    f"letti {result['read_mb']} MB  picco RSS {result['peak_rss_mb']} MB"
+                )
+
+    path = save_results('rasterizer', results, args.output)
+    print(f"Risultati salvati in {path}")
+
+    if args.compare:
+        return report_regressions(compare_results(args.compare, results, args.threshold))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
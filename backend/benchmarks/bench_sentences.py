@@ -0,0 +1,105 @@
+"""
+Benchmark della segmentazione in frasi su testi di più megabyte
+
+Misura il throughput della segmentazione (testo intero e a blocchi) per
+dimensioni crescenti: con un algoritmo lineare i secondi per MB restano
+costanti al crescere del testo.
+
+Uso (dalla cartella backend):
+    python -m benchmarks.bench_sentences --sizes 1,4,16
+    python -m benchmarks.bench_sentences --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import compare_results, report_regressions, save_results
+from benchmarks.fixtures import WORDS
+
+# Frammenti con abbreviazioni, numeri e citazioni per esercitare i casi ambigui
+SNIPPETS = (
+    "Come spiega il prof. Bianchi a pag. 12,",
+    "secondo il dott. G. Verdi (cfr. cap. 3)",
+    "nel 1848 ecc.",
+    "alle ore 10.30 circa",
+    'disse: "Basta!"',
+)
+
+CHUNK_SIZE = 64 * 1024
+
+def build_text(size_mb: float, seed: int = 42) -> str:
+    """Testo sintetico di circa size_mb MB con frasi, paragrafi e abbreviazioni"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    length = 0
+    while length < target:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 25))]
+        if rng.random() < 0.3:
+            words.insert(rng.randint(0, len(words)), rng.choice(SNIPPETS))
+        sentence = ' '.join(words).capitalize() + rng.choice('..........!?')
+        separator = '\n\n' if rng.random() < 0.1 else ' '
+        parts.append(sentence + separator)
+        length += len(sentence) + len(separator)
+    return ''.join(parts)
+
+def _measure(text: str) -> Dict[str, Any]:
+    from src.sentences import iter_sentence_spans, iter_sentences
+
+    started = time.perf_counter()
+    spans = list(iter_sentence_spans(text))
+    whole = time.perf_counter() - started
+
+    chunks = (text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE))
+    started = time.perf_counter()
+    streamed = [(start, end) for start, end, _ in iter_sentences(chunks)]
+    streaming = time.perf_counter() - started
+
+    return {
+        'sentences': len(spans),
+        'whole': whole,
+        'streaming': streaming,
+        'streaming_matches': streamed == spans,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Throughput della segmentazione in frasi")
+    parser.add_argument('--sizes', default='1,4,16', help="Dimensioni del testo in MB, separate da virgola")
+    parser.add_argument('--output', help="File JSON dei risultati")
+    parser.add_argument('--compare', help="JSON di un run precedente da usare come baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Rallentamento relativo oltre cui segnalare una regressione")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for size in (float(value) for value in args.sizes.split(',') if value):
+        text = build_text(size)
+        run = _measure(text)
+        megabytes = len(text.encode('utf-8')) / (1024 * 1024)
+        print(
+            f"{megabytes:6.1f} MB  {run['sentences']:>8} frasi  "
+            f"intero {run['whole']:6.2f}s ({run['whole'] / megabytes:.3f} s/MB)  "
+            f"a blocchi {run['streaming']:6.2f}s  output identico: {run['streaming_matches']}"
+        )
+        results.append({
+            'name': f"sentences_{size:g}mb",
+            'megabytes': round(megabytes, 2),
+            'sentences': run['sentences'],
+            'streaming_matches': run['streaming_matches'],
+            'timings': {
+                'whole': round(run['whole'], 4),
+                'streaming': round(run['streaming'], 4),
+            },
+        })
+
+    path = save_results('sentences', results, args.output)
+    print(f"Risultati salvati in {path}")
+
+    if args.compare:
+        return report_regressions(compare_results(args.compare, results, args.threshold))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark dell'avvio a freddo del backend
+
+Misura, in un processo nuovo per ogni ripetizione, il tempo fino alla prima
+risposta di /health (ciò che attende la prima schermata dell'app) e il tempo
+fino a /ready (motori OCR, PDF ed export caricati).
+
+Uso (dalla cartella backend):
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --command ../dist/backend/pdf-processor --port 8000
+"""
+
+import argparse
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import compare_results, report_regressions, save_results
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Avvio equivalente a `python main.py`, ma sulla porta scelta dal benchmark
+SERVER_SCRIPT = (
+    "import sys, uvicorn, main; "
+    "uvicorn.run(main.app, host='127.0.0.1', port=int(sys.argv[1]), log_level='warning')"
+)
+
+POLL_INTERVAL = 0.01
+
+def _status(url: str) -> Optional[int]:
+    """Codice HTTP dell'endpoint, None se il server non accetta ancora connessioni"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+
+def _wait_for(url: str, accept, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        if accept(_status(url)):
+            return time.perf_counter() - started
+        time.sleep(POLL_INTERVAL)
+    raise TimeoutError(f"{url} non ha risposto entro {timeout}s")
+
+def measure_startup(command: List[str], port: int, timeout: float) -> Dict[str, float]:
+    """Avvia il server e misura prima risposta e prontezza dei motori"""
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        first_response = _wait_for(f"{base_url}/health", lambda status: status == 200, started, timeout)
+        ready = _wait_for(f"{base_url}/ready", lambda status: status == 200, started, timeout)
+        return {
+            'first_response': round(first_response, 4),
+            'ready': round(ready, 4),
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dell'avvio del backend PDF DSA")
+    parser.add_argument('--command', help="Comando del server da misurare (es. il binario PyInstaller); default: interprete corrente")
+    parser.add_argument('--port', type=int, default=8765, help="Porta su cui il server ascolta")
+    parser.add_argument('--repeat', type=int, default=5, help="Numero di avvii (si usa la mediana)")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Attesa massima per avvio (secondi)")
+    parser.add_argument('--output', help="File JSON dei risultati")
+    parser.add_argument('--compare', help="JSON di un run precedente da usare come baseline")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Rallentamento relativo oltre cui segnalare una regressione")
+    args = parser.parse_args()
+
+    if args.command:
+        command = shlex.split(args.command)
+        name = Path(command[0]).name
+    else:
+        command = [sys.executable, '-c', SERVER_SCRIPT, str(args.port)]
+        name = 'python_main'
+
+    runs = [measure_startup(command, args.port, args.timeout) for _ in range(args.repeat)]
+    timings = {
+        metric: round(statistics.median(run[metric] for run in runs), 4)
+        for metric in ('first_response', 'ready')
+    }
+    result: Dict[str, Any] = {
+        'name': f"startup_{name}",
+        'command': command,
+        'timings': timings,
+        'runs': runs,
+    }
+
+    print(f"{result['name']}: prima risposta {timings['first_response']:.3f}s, motori pronti {timings['ready']:.3f}s")
+
+    path = save_results('startup', [result], args.output)
+    print(f"Risultati salvati in {path}")
+
+    if args.compare:
+        return report_regressions(compare_results(args.compare, [result], args.threshold))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Utility condivise dai benchmark: misura della memoria, salvataggio e confronto dei risultati
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def peak_rss_mb() -> Optional[float]:
+    """Picco di memoria residente del processo corrente e dei suoi figli (MB)"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil, se disponibile, fornisce il picco del working set
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+        except Exception:
+            return None
+
+    # ru_maxrss è in KB su Linux e in byte su macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    children_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor
+
+    # Su Linux ru_maxrss sopravvive a fork/exec e include il picco del processo padre:
+    # VmHWM invece si azzera all'exec e misura solo questo processo
+    status_path = Path('/proc/self/status')
+    if status_path.exists():
+        for line in status_path.read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                self_peak = int(line.split()[1]) / 1024
+                return round(max(self_peak, children_peak), 1)
+
+    self_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+    return round(max(self_peak, children_peak), 1)
+
+def environment_info() -> Dict[str, Any]:
+    """Metadati della macchina su cui gira il benchmark"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def save_results(suite: str, results: List[Dict[str, Any]], output: Optional[str] = None) -> Path:
+    """Salva i risultati in JSON (default: results/<suite>_<timestamp>.json)"""
+    path = Path(output) if output else RESULTS_DIR / f"{suite}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {'suite': suite, 'environment': environment_info(), 'results': results}
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path
+
+def _flatten_timings(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Mappa 'benchmark/metrica' -> secondi per tutte le voci confrontabili"""
+    flat = {}
+    for result in results:
+        for metric, seconds in result.get('timings', {}).items():
+            flat[f"{result['name']}/{metric}"] = seconds
+    return flat
+
+def compare_results(
+    baseline_path: str,
+    results: List[Dict[str, Any]],
+    threshold: float = 0.15,
+    min_delta: float = 0.02
+) -> List[Dict[str, Any]]:
+    """Confronta con un run precedente e restituisce le regressioni
+
+    Una metrica è in regressione se è più lenta di oltre `threshold` (relativo)
+    e di almeno `min_delta` secondi (per ignorare il rumore sulle misure brevi).
+    """
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    old = _flatten_timings(baseline['results'])
+    new = _flatten_timings(results)
+
+    regressions = []
+    for key, seconds in sorted(new.items()):
+        previous = old.get(key)
+        if previous is None or previous <= 0:
+            continue
+        delta = seconds - previous
+        if delta > min_delta and delta / previous > threshold:
+            regressions.append({
+                'metric': key,
+                'baseline': previous,
+                'current': seconds,
+                'change': round(delta / previous, 3),
+            })
+    return regressions
+
+def report_regressions(regressions: List[Dict[str, Any]]) -> int:
+    """Stampa le regressioni e restituisce il codice di uscita (1 se presenti)"""
+    if not regressions:
+        print("Nessuna regressione rispetto alla baseline")
+        return 0
+
+    print("Regressioni rilevate:")
+    for regression in regressions:
+        print(
+            f"  {regression['metric']}: {regression['baseline']:.3f}s -> "
+            f"{regression['current']:.3f}s (+{regression['change'] * 100:.0f}%)"
+        )
+    return 1
@@ -0,0 +1,197 @@
+"""
+Generazione offline di PDF sintetici per i benchmark
+
+Tutti i fixture sono deterministici (seed fisso): PDF nativi con testo,
+versioni "scannerizzate" rasterizzate con inclinazione e rumore controllati
+e documenti misti. Nessuna dipendenza oltre a Pillow e NumPy.
+"""
+
+import io
+import random
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Formato A4 in punti PDF
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+WORDS = (
+    "il la di che e un una per con non sono come anche questo questa più "
+    "scuola studente lettura testo pagina capitolo esercizio risposta domanda "
+    "esempio regola parola frase verbo nome aggettivo storia geografia scienze "
+    "matematica numero problema soluzione calcolo figura tabella città fiume "
+    "montagna popolazione periodo secolo guerra pace lavoro famiglia tempo "
+    "perché quando dove sempre spesso molto poco grande piccolo nuovo antico "
+    "importante necessario possibile difficile facile attività verifica"
+).split()
+
+def generate_page_lines(rng: random.Random, page_number: int, lines_per_page: int = 42) -> List[str]:
+    """Genera le righe di una pagina con titoli, paragrafi ed elenchi"""
+    lines = [f"{page_number}. Capitolo {page_number}", ""]
+    while len(lines) < lines_per_page:
+        kind = rng.random()
+        if kind < 0.15:
+            for _ in range(rng.randint(2, 4)):
+                lines.append("- " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 7))))
+            lines.append("")
+        else:
+            words = [rng.choice(WORDS) for _ in range(rng.randint(40, 90))]
+            sentence_start = True
+            text_words = []
+            for word in words:
+                text_words.append(word.capitalize() if sentence_start else word)
+                sentence_start = rng.random() < 0.1
+                if sentence_start:
+                    text_words[-1] += "."
+            paragraph = " ".join(text_words).rstrip(".") + "."
+            # A capo ogni ~80 caratteri, come in un PDF impaginato
+            line = ""
+            for word in paragraph.split():
+                if len(line) + len(word) + 1 > 80:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = f"{line} {word}".strip()
+            lines.append(line)
+            lines.append("")
+    return lines[:lines_per_page]
+
+def _escape_pdf_text(text: str) -> bytes:
+    encoded = text.encode('cp1252', errors='replace')
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def _text_stream(lines: List[str]) -> bytes:
+    parts = [b"BT /F1 11 Tf 50 800 Td 17 TL"]
+    for line in lines:
+        parts.append(b"(" + _escape_pdf_text(line) + b") '")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+def render_scanned_page(
+    lines: List[str],
+    dpi: int = 200,
+    skew_degrees: float = 0.0,
+    noise_sigma: float = 0.0,
+    seed: int = 0
+) -> Image.Image:
+    """Rasterizza le righe di una pagina simulando una scansione"""
+    width = int(PAGE_WIDTH / 72 * dpi)
+    height = int(PAGE_HEIGHT / 72 * dpi)
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=int(11 / 72 * dpi))
+
+    x = int(50 / 72 * dpi)
+    y = int(42 / 72 * dpi)
+    line_height = int(17 / 72 * dpi)
+    for line in lines:
+        draw.text((x, y), line, fill=0, font=font)
+        y += line_height
+
+    if skew_degrees:
+        image = image.rotate(skew_degrees, resample=Image.BICUBIC, fillcolor=255)
+
+    if noise_sigma:
+        rng = np.random.default_rng(seed)
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += rng.normal(0.0, noise_sigma, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    return image
+
+def write_pdf(path: Path, pages: List[dict]):
+    """Scrive un PDF minimale; ogni pagina è {'lines': [...]} oppure {'image': PIL.Image}"""
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pages_id = add(b"")  # riempito alla fine
+    page_ids = []
+
+    for page in pages:
+        if 'image' in page:
+            buffer = io.BytesIO()
+            page['image'].save(buffer, format='JPEG', quality=75)
+            data = buffer.getvalue()
+            width, height = page['image'].size
+            image_id = add(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n" % (width, height, len(data))
+                + data + b"\nendstream"
+            )
+            content = b"q %d 0 0 %d 0 0 cm /Im1 Do Q" % (PAGE_WIDTH, PAGE_HEIGHT)
+            resources = b"<< /XObject << /Im1 %d 0 R >> >>" % image_id
+        else:
+            content = _text_stream(page['lines'])
+            resources = b"<< /Font << /F1 %d 0 R >> >>" % font_id
+
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>"
+            % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, resources, content_id)
+        ))
+
+    objects[pages_id - 1] = (
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        + b"] /Count %d >>" % len(page_ids)
+    )
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(output))
+
+def build_fixture(
+    kind: str,
+    page_count: int,
+    skew_degrees: float = 1.5,
+    noise_sigma: float = 12.0,
+    seed: int = 42,
+    output_dir: Optional[Path] = None
+) -> Path:
+    """Crea (o riusa dalla cache) un fixture: kind è 'native', 'scanned' o 'mixed'"""
+    output_dir = output_dir or FIXTURES_DIR
+    if kind == 'native':
+        name = f"native_{page_count}p_s{seed}.pdf"
+    else:
+        name = f"{kind}_{page_count}p_skew{skew_degrees}_noise{noise_sigma}_s{seed}.pdf"
+    path = output_dir / name
+    if path.exists():
+        return path
+
+    rng = random.Random(seed)
+    pages = []
+    for page_number in range(1, page_count + 1):
+        lines = generate_page_lines(rng, page_number)
+        scanned = kind == 'scanned' or (kind == 'mixed' and page_number % 2 == 0)
+        if scanned:
+            # Inclinazione alternata per pagina, entro ±skew_degrees
+            skew = skew_degrees * (1 if page_number % 2 else -1) * rng.uniform(0.5, 1.0)
+            pages.append({'image': render_scanned_page(lines, skew_degrees=skew, noise_sigma=noise_sigma, seed=seed + page_number)})
+        elif kind in ('native', 'mixed'):
+            pages.append({'lines': lines})
+        else:
+            raise ValueError(f"Tipo di fixture non supportato: {kind}")
+
+    write_pdf(path, pages)
+    return path
@@ -8,6 +8,8 @@ import sys
 import subprocess
 from pathlib import Path
 
+from src.engines import ENGINE_MODULES
+
 def build_backend():
     """Builda il backend Python"""
     backend_dir = Path(__file__).parent
@@ -24,9 +26,15 @@ def build_backend():
         "--hidden-import", "uvicorn",
         "--hidden-import", "fastapi",
         "--hidden-import", "pydantic",
-        "main.py"
     ]
     
+    # I motori caricati in background (importlib) non sono visibili all'analisi di PyInstaller
+    for modules in ENGINE_MODULES.values():
+        for module in modules:
+            cmd += ["--hidden-import", module]
+    
+    cmd.append("main.py")
+    
     print("Building backend with PyInstaller...")
     subprocess.run(cmd, cwd=backend_dir, check=True)
     print("Backend build completed!")
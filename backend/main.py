@@ -1,22 +1,48 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Callable, List, Literal, Optional, Dict, Any
 import asyncio
 import os
 import tempfile
 import shutil
 from pathlib import Path
+from contextlib import asynccontextmanager
 import uuid
 import json
+import time
+import logging
 
 from src.pdf_processor import PDFProcessor
 from src.text_normalizer import TextNormalizer
 from src.structure_reconstructor import StructureReconstructor
 from src.export_manager import ExportManager
-from src.models import ProcessingJob, ProcessingOptions, DSAProfile, PDFInfo
+from src.html_reader import READER_PAGE_SIZE, ReaderStore, is_reader_index
+from src.job_events import JobEventBus, JobProgressReporter, job_event
+from src.cancellation import JobCancelledError
+from src.engines import EngineWarmup
+from src.job_store import FINISHED_STATUSES, ContentStore, JobStore, job_summary
+from src import metrics
+from src.preview import PREVIEW_MAX_PAGES, PREVIEW_PAGES, PreviewService
+from src.profiler import CURRENT_PROFILER, SamplingProfiler
+from src.thumbnails import THUMBNAIL_DPI, THUMBNAIL_FORMATS, ThumbnailCache
+from src.models import ProcessingJob, ProcessingBatch, ProcessingOptions, DSAProfile, PDFInfo, OCRPageInfo
 
-app = FastAPI(title="PDF DSA Converter API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+# Pre-caricamento dei motori pesanti: il server risponde subito a /health
+# mentre OCR, PDF ed export vengono importati in background
+engine_warmup = EngineWarmup()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = asyncio.create_task(engine_warmup.warm_up())
+    yield
+    warmup_task.cancel()
+    pdf_processor.shutdown()
+
+app = FastAPI(title="PDF DSA Converter API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware per comunicazione con Electron
 app.add_middleware(
@@ -32,18 +58,93 @@ pdf_processor = PDFProcessor()
 text_normalizer = TextNormalizer()
 structure_reconstructor = StructureReconstructor()
 export_manager = ExportManager()
+preview_service = PreviewService(pdf_processor, text_normalizer, structure_reconstructor, export_manager)
+thumbnail_cache = ThumbnailCache(pdf_processor.rasterizer)
+reader_store = ReaderStore()
+
+# Le miniature sono legate al contenuto del file (ETag), ma l'URL è il percorso:
+# il client le riusa per un'ora e poi le rivalida con If-None-Match
+THUMBNAIL_CACHE_CONTROL = "private, max-age=3600"
+
+# Retention dei job terminati: scadono dopo JOB_RETENTION_SECONDS e ne
+# vengono tenuti al massimo MAX_FINISHED_JOBS (i meno usati escono per primi)
+JOB_RETENTION_SECONDS = 6 * 3600
+MAX_FINISHED_JOBS = 500
+
+def _in_running_batch(job: ProcessingJob) -> bool:
+    """Vero se il job appartiene a un batch non ancora terminato"""
+    batch = processing_batches.peek(job.batch_id) if job.batch_id else None
+    return batch is not None and batch.status not in FINISHED_STATUSES
+
+# Store per i job in corso (quelli di un batch attivo restano fino alla sua fine)
+processing_jobs = JobStore(
+    ttl_seconds=JOB_RETENTION_SECONDS,
+    max_finished=MAX_FINISHED_JOBS,
+    is_pinned=_in_running_batch
+)
+
+# Store per i batch (gruppi di job elaborati come un'unica unità)
+processing_batches = JobStore(ttl_seconds=JOB_RETENTION_SECONDS, max_finished=MAX_FINISHED_JOBS)
+
+# Contenuti strutturati dei job completati, per riesportarli con altri profili
+# e formati senza rielaborare il PDF (LRU limitato in numero e caratteri)
+MAX_EXPORT_CONTENTS = 100
+MAX_EXPORT_CONTENT_CHARS = 50_000_000
+job_contents = ContentStore(
+    max_items=MAX_EXPORT_CONTENTS,
+    max_chars=MAX_EXPORT_CONTENT_CHARS,
+    ttl_seconds=JOB_RETENTION_SECONDS
+)
+
+# Gauge calcolati solo al momento dello scrape di /metrics
+metrics.QUEUE_DEPTH.set_function(lambda: sum(1 for job in processing_jobs.values() if job.status == 'pending'))
+metrics.ACTIVE_JOBS.set_function(lambda: sum(1 for job in processing_jobs.values() if job.status == 'processing'))
 
-# Store per i job in corso
-processing_jobs: Dict[str, ProcessingJob] = {}
+# Dimensione massima di una pagina di /jobs
+MAX_JOBS_PAGE_SIZE = 200
+
+# Canale push (SSE) per avanzamento e cambi di fase dei job
+job_events = JobEventBus()
+
+# Intervallo dei messaggi keep-alive sugli stream SSE (secondi)
+SSE_KEEPALIVE_INTERVAL = 15
+
+# Dimensione dei blocchi usati per copiare gli upload su disco
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class AnalyzeRequest(BaseModel):
+    file_path: str
 
 class ProcessingRequest(BaseModel):
     file_path: str
     options: ProcessingOptions
 
+class BatchRequest(BaseModel):
+    file_paths: List[str]
+    options: ProcessingOptions
+
+class PreviewRequest(BaseModel):
+    file_path: str
+    dsa_profile: DSAProfile
+    page: Optional[int] = Field(None, ge=1)  # Singola pagina; se assente, le prime `pages`
+    pages: int = Field(PREVIEW_PAGES, ge=1, le=PREVIEW_MAX_PAGES)
+    ocr_language: Literal['auto', 'ita', 'eng', 'ita+eng'] = 'auto'
+
+class ExportRequest(BaseModel):
+    dsa_profile: DSAProfile
+    output_formats: List[Literal['docx', 'pdf', 'epub', 'html']]
+    output_directory: str
+
 class JobStatusResponse(BaseModel):
     job_id: str
     status: str
     progress: int
+    stage: Optional[str] = None
+    pages_done: int = 0
+    pages_total: int = 0
+    stage_timings: Dict[str, float] = {}
+    ocr_pages: List[OCRPageInfo] = []
+    readability: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     output_files: Optional[List[str]] = None
 
@@ -60,125 +161,540 @@ async def health_check():
         "export_manager": "ready"
     }}
 
+@app.get("/ready")
+async def readiness_check():
+    """Stato di caricamento dei motori (503 finché il warm-up non è completo)"""
+    snapshot = engine_warmup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+async def _save_upload_to_temp(file: UploadFile) -> str:
+    """Copia un upload su un file temporaneo a blocchi, senza caricarlo tutto in memoria"""
+    def copy_to_disk() -> str:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+            try:
+                file.file.seek(0)
+                shutil.copyfileobj(file.file, tmp_file, UPLOAD_CHUNK_SIZE)
+            except Exception:
+                tmp_file.close()
+                os.unlink(tmp_file.name)
+                raise
+            return tmp_file.name
+    
+    return await asyncio.to_thread(copy_to_disk)
+
+def _resolve_local_pdf(file_path: str) -> str:
+    """Verifica che un percorso locale punti a un PDF leggibile"""
+    path = Path(file_path).expanduser()
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"File non trovato: {file_path}")
+    if path.suffix.lower() != '.pdf':
+        raise HTTPException(status_code=400, detail=f"Il file non è un PDF: {file_path}")
+    return str(path.resolve())
+
+def _cleanup_job_file(job: ProcessingJob):
+    """Rimuove il file del job solo se è una copia temporanea creata dal backend"""
+    if job.owns_file and os.path.exists(job.file_path):
+        os.unlink(job.file_path)
+
+def _create_job(file_path: str, file_name: str, owns_file: bool, batch_id: Optional[str] = None) -> ProcessingJob:
+    """Registra un nuovo job in attesa di elaborazione"""
+    job = ProcessingJob(
+        id=str(uuid.uuid4()),
+        file_path=file_path,
+        file_name=file_name,
+        owns_file=owns_file,
+        batch_id=batch_id,
+        status="pending",
+        progress=0
+    )
+    
+    processing_jobs[job.id] = job
+    return job
+
+def _start_job(
+    background_tasks: BackgroundTasks,
+    file_path: str,
+    file_name: str,
+    options: ProcessingOptions,
+    owns_file: bool
+) -> str:
+    """Registra un nuovo job e ne avvia l'elaborazione in background"""
+    job = _create_job(file_path, file_name, owns_file)
+    background_tasks.add_task(process_pdf_background, job.id, options)
+    return job.id
+
+def _start_batch(background_tasks: BackgroundTasks, jobs: List[ProcessingJob], options: ProcessingOptions) -> ProcessingBatch:
+    """Registra un batch di job e ne avvia l'elaborazione come un'unica unità"""
+    batch = ProcessingBatch(
+        id=jobs[0].batch_id,
+        job_ids=[job.id for job in jobs],
+        status="pending",
+        progress=0
+    )
+    
+    processing_batches[batch.id] = batch
+    background_tasks.add_task(process_batch_background, batch.id, options)
+    return batch
+
+@app.get("/metrics")
+async def get_metrics():
+    """Metriche operative in formato testo Prometheus"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/analyze-pdf")
 async def analyze_pdf(file: UploadFile = File(...)):
     """Analizza un PDF per determinare se è nativo o scannerizzato"""
+    tmp_file_path = None
     try:
         # Salva il file temporaneamente
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        tmp_file_path = await _save_upload_to_temp(file)
         
         # Analizza il PDF
         pdf_info = await pdf_processor.analyze_pdf(tmp_file_path)
         
+        return pdf_info.dict()
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Errore nell'analisi del PDF: {str(e)}")
+    
+    finally:
         # Pulisci il file temporaneo
-        os.unlink(tmp_file_path)
-        
+        if tmp_file_path and os.path.exists(tmp_file_path):
+            os.unlink(tmp_file_path)
+
+@app.post("/analyze-pdf-path")
+async def analyze_pdf_path(request: AnalyzeRequest):
+    """Analizza un PDF già presente sul disco locale, senza copiarlo"""
+    file_path = _resolve_local_pdf(request.file_path)
+    try:
+        pdf_info = await pdf_processor.analyze_pdf(file_path)
         return pdf_info.dict()
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore nell'analisi del PDF: {str(e)}")
 
+@app.post("/preview", response_class=HTMLResponse)
+async def preview_pdf(request: PreviewRequest):
+    """Anteprima HTML di una pagina o delle prime pagine con il profilo scelto"""
+    if not os.path.exists(request.file_path):
+        raise HTTPException(status_code=404, detail="File non trovato")
+    
+    if request.page is not None:
+        first_page = last_page = request.page
+    else:
+        first_page, last_page = 1, request.pages
+    try:
+        html = await preview_service.render(
+            request.file_path,
+            request.dsa_profile,
+            first_page,
+            last_page,
+            request.ocr_language
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Errore nell'anteprima: {str(e)}")
+    
+    return HTMLResponse(html)
+
+@app.get("/thumbnail")
+async def get_thumbnail(
+    request: Request,
+    file_path: str,
+    page: int = 1,
+    dpi: int = THUMBNAIL_DPI,
+    format: Literal['webp', 'png'] = 'webp'
+):
+    """Miniatura di una pagina di un PDF locale (WebP o PNG), servita dalla cache su disco"""
+    pdf_path = _resolve_local_pdf(file_path)
+    
+    etag = await asyncio.to_thread(thumbnail_cache.etag, pdf_path, page, dpi, format)
+    headers = {"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        path = await asyncio.to_thread(thumbnail_cache.get, pdf_path, page, dpi, format)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Errore nella generazione della miniatura: {str(e)}")
+    
+    return FileResponse(path, media_type=THUMBNAIL_FORMATS[format], headers=headers)
+
 @app.post("/process-pdf")
 async def process_pdf(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    options: str = None
+    options: Optional[str] = Form(None)
 ):
     """Avvia l'elaborazione di un PDF"""
     try:
         # Parse delle opzioni
         processing_options = ProcessingOptions.parse_raw(options) if options else ProcessingOptions()
         
-        # Genera ID job
-        job_id = str(uuid.uuid4())
-        
         # Salva il file temporaneamente
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        tmp_file_path = await _save_upload_to_temp(file)
         
-        # Crea il job
-        job = ProcessingJob(
-            id=job_id,
-            file_path=tmp_file_path,
-            file_name=file.filename,
-            status="pending",
-            progress=0
-        )
-        
-        processing_jobs[job_id] = job
-        
-        # Avvia l'elaborazione in background
-        background_tasks.add_task(process_pdf_background, job_id, processing_options)
+        job_id = _start_job(background_tasks, tmp_file_path, file.filename, processing_options, owns_file=True)
         
         return {"job_id": job_id, "status": "started"}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Errore nell'avvio dell'elaborazione: {str(e)}")
 
+@app.post("/process-pdf-path")
+async def process_pdf_path(request: ProcessingRequest, background_tasks: BackgroundTasks):
+    """Avvia l'elaborazione di un PDF locale leggendolo direttamente dal disco"""
+    file_path = _resolve_local_pdf(request.file_path)
+    job_id = _start_job(background_tasks, file_path, Path(file_path).name, request.options, owns_file=False)
+    return {"job_id": job_id, "status": "started"}
+
+@app.post("/process-batch")
+async def process_batch(request: BatchRequest, background_tasks: BackgroundTasks):
+    """Avvia l'elaborazione di più PDF locali come un unico batch"""
+    if not request.file_paths:
+        raise HTTPException(status_code=400, detail="Nessun file indicato")
+    
+    file_paths = [_resolve_local_pdf(file_path) for file_path in request.file_paths]
+    
+    batch_id = str(uuid.uuid4())
+    jobs = [_create_job(file_path, Path(file_path).name, owns_file=False, batch_id=batch_id) for file_path in file_paths]
+    batch = _start_batch(background_tasks, jobs, request.options)
+    
+    return {"batch_id": batch.id, "job_ids": batch.job_ids, "status": "started"}
+
+@app.post("/process-batch-upload")
+async def process_batch_upload(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    options: Optional[str] = Form(None)
+):
+    """Avvia l'elaborazione di più PDF caricati come un unico batch"""
+    try:
+        processing_options = ProcessingOptions.parse_raw(options) if options else ProcessingOptions()
+        
+        batch_id = str(uuid.uuid4())
+        jobs = []
+        try:
+            for file in files:
+                tmp_file_path = await _save_upload_to_temp(file)
+                jobs.append(_create_job(tmp_file_path, file.filename, owns_file=True, batch_id=batch_id))
+        except Exception:
+            # Upload parziale: i job già creati non partiranno mai, quindi si
+            # rimuovono subito insieme ai file temporanei
+            for job in jobs:
+                _cleanup_job_file(job)
+                del processing_jobs[job.id]
+            raise
+        
+        batch = _start_batch(background_tasks, jobs, processing_options)
+        
+        return {"batch_id": batch.id, "job_ids": batch.job_ids, "status": "started"}
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Errore nell'avvio del batch: {str(e)}")
+
+async def process_batch_background(batch_id: str, options: ProcessingOptions):
+    """Elabora i job di un batch condividendo worker, motori OCR e profili"""
+    batch = processing_batches[batch_id]
+    batch.status = "processing"
+    _publish_batch(batch)
+    
+    # Tanti job in parallelo quanti worker: ogni job ha una pagina in lavorazione
+    # alla volta, così il pool resta pieno anche con molti PDF piccoli
+    semaphore = asyncio.Semaphore(pdf_processor.max_workers)
+    
+    async def run_job(job_id: str):
+        async with semaphore:
+            await process_pdf_background(job_id, options)
+        _publish_batch(batch)
+    
+    await asyncio.gather(*(run_job(job_id) for job_id in batch.job_ids))
+    
+    statuses = [job.status for job in _batch_jobs(batch)]
+    if statuses and all(status == "error" for status in statuses):
+        batch.status = "error"
+    elif "completed" not in statuses:
+        batch.status = "cancelled"
+    else:
+        batch.status = "completed"
+    batch.progress = 100
+    batch.finished_at = time.time()
+    
+    # Manifest unico con gli output di tutti i file del batch
+    try:
+        os.makedirs(options.output_directory, exist_ok=True)
+        manifest_path = os.path.join(options.output_directory, f"batch_{batch.id}_manifest.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(_batch_manifest(batch), f, ensure_ascii=False, indent=2)
+        batch.manifest_path = manifest_path
+    except Exception as e:
+        logger.error(f"Errore nella scrittura del manifest del batch {batch.id}: {e}")
+    
+    _publish_batch(batch)
+
+def _batch_jobs(batch: ProcessingBatch) -> List[ProcessingJob]:
+    """Job del batch ancora presenti nello store"""
+    return [processing_jobs[job_id] for job_id in batch.job_ids if job_id in processing_jobs]
+
+def _batch_progress(batch: ProcessingBatch) -> int:
+    """Avanzamento aggregato del batch, pesato sul numero di pagine dei file"""
+    total_weight = 0
+    weighted_progress = 0
+    for job in _batch_jobs(batch):
+        weight = job.pages_total or 1
+        total_weight += weight
+        weighted_progress += job.progress * weight
+    return int(weighted_progress / total_weight) if total_weight else 0
+
+def _batch_manifest(batch: ProcessingBatch) -> Dict[str, Any]:
+    """Riepilogo del batch con gli output di ogni file"""
+    jobs = _batch_jobs(batch)
+    return {
+        "batch_id": batch.id,
+        "status": batch.status,
+        "progress": batch.progress,
+        "total": len(jobs),
+        "completed": sum(1 for job in jobs if job.status == "completed"),
+        "failed": sum(1 for job in jobs if job.status == "error"),
+        "cancelled": sum(1 for job in jobs if job.status == "cancelled"),
+        "pages": sum(job.pages_total for job in jobs),
+        "manifest_path": batch.manifest_path,
+        "files": [
+            {
+                "job_id": job.id,
+                "file_name": job.file_name,
+                "status": job.status,
+                "pages": job.pages_total,
+                "output_files": job.output_files or [],
+                "stage_timings": job.stage_timings,
+                "readability": job.readability,
+                "error": job.error,
+            }
+            for job in jobs
+        ],
+    }
+
+def _batch_event(batch: ProcessingBatch) -> Dict[str, Any]:
+    """Evento SSE con lo stato aggregato di un batch"""
+    jobs = _batch_jobs(batch)
+    return {
+        "type": "batch",
+        "batch_id": batch.id,
+        "status": batch.status,
+        "progress": batch.progress,
+        "total": len(jobs),
+        "completed": sum(1 for job in jobs if job.status == "completed"),
+        "failed": sum(1 for job in jobs if job.status == "error"),
+        "cancelled": sum(1 for job in jobs if job.status == "cancelled"),
+        "manifest_path": batch.manifest_path,
+        "timestamp": time.time(),
+    }
+
+def _publish_batch(batch: ProcessingBatch):
+    """Aggiorna l'avanzamento aggregato del batch e lo pubblica"""
+    if batch.status == "processing":
+        batch.progress = _batch_progress(batch)
+    job_events.publish(batch.id, _batch_event(batch))
+
 async def process_pdf_background(job_id: str, options: ProcessingOptions):
     """Elabora un PDF in background"""
+    job = processing_jobs.get(job_id)
+    if job is None:
+        # Job eliminato prima dell'avvio
+        return
+    
+    reporter = JobProgressReporter(job, job_events)
+    cancel_token = job.cancel_token
+    
+    # Profiling opzionale: campiona l'event loop e i worker mentre lavorano per questo job
+    profiler = SamplingProfiler() if options.enable_profiling else None
+    profiler_token = CURRENT_PROFILER.set(profiler) if profiler else None
+    if profiler:
+        profiler.start()
+        profiler.attach_thread()
+    
     try:
-        job = processing_jobs[job_id]
+        cancel_token.raise_if_cancelled()
         job.status = "processing"
-        job.progress = 10
         
         # 1. Analizza il PDF
+        reporter.stage('analyze')
         pdf_info = await pdf_processor.analyze_pdf(job.file_path)
-        job.progress = 20
+        job.pages_total = pdf_info.page_count
         
         # 2. Estrai il testo
+        reporter.stage('extract')
         if pdf_info.is_native:
-            text_content = await pdf_processor.extract_text_native(job.file_path)
+            text_content = await pdf_processor.extract_text_native(
+                job.file_path,
+                progress_callback=reporter.pages,
+                cancel_token=cancel_token,
+                trace=job.trace,
+                text_backend=options.text_backend
+            )
         else:
             text_content = await pdf_processor.extract_text_ocr(
                 job.file_path, 
                 language=options.ocr_language,
                 enable_deskew=options.enable_deskew,
-                enable_denoise=options.enable_denoise
+                enable_denoise=options.enable_denoise,
+                detect_orientation=options.detect_orientation,
+                document_type=options.document_type,
+                crop_to_content=options.crop_to_content,
+                detect_duplicates=options.detect_duplicates,
+                progress_callback=reporter.pages,
+                cancel_token=cancel_token,
+                trace=job.trace,
+                page_callback=job.ocr_pages.append
             )
-        job.progress = 50
         
         # 3. Normalizza il testo
-        normalized_text = await text_normalizer.normalize_text(text_content)
-        job.progress = 70
+        reporter.stage('normalize')
+        normalized_text = await text_normalizer.normalize_text(text_content, cancel_token=cancel_token)
         
         # 4. Ricostruisci la struttura
-        structured_content = await structure_reconstructor.reconstruct_structure(normalized_text)
-        job.progress = 80
+        cancel_token.raise_if_cancelled()
+        reporter.stage('structure')
+        structured_content = await structure_reconstructor.reconstruct_structure(
+            normalized_text,
+            ocr_pages=job.ocr_pages,
+            cancel_token=cancel_token
+        )
+        job.readability = structured_content['metadata']['readability']
+        _release_layouts(job)
         
         # 5. Esporta nei formati richiesti
-        output_files = []
-        for format_type in options.output_formats:
-            output_path = await export_manager.export_document(
-                structured_content,
-                options.dsa_profile,
-                format_type,
-                options.output_directory,
-                job.file_name
-            )
-            output_files.append(output_path)
-        
-        job.progress = 100
-        job.status = "completed"
-        job.output_files = output_files
+        reporter.stage('export')
+        job.output_files = await _export_formats(
+            job,
+            structured_content,
+            options.dsa_profile,
+            options.output_formats,
+            options.output_directory,
+            reporter
+        )
+        job_contents.put(job.id, structured_content)
+        reporter.finish("completed")
         
         # Pulisci il file temporaneo
-        if os.path.exists(job.file_path):
-            os.unlink(job.file_path)
+        _cleanup_job_file(job)
+    
+    except JobCancelledError:
+        logger.info(f"Job {job.id} annullato")
+        reporter.finish("cancelled")
+        _cleanup_job_file(job)
     
     except Exception as e:
-        job = processing_jobs[job_id]
-        job.status = "error"
         job.error = str(e)
+        reporter.finish("error")
         
         # Pulisci il file temporaneo
-        if os.path.exists(job.file_path):
-            os.unlink(job.file_path)
+        _cleanup_job_file(job)
+    
+    finally:
+        _release_layouts(job)
+        if profiler:
+            profiler.detach_thread()
+            profiler.stop()
+            CURRENT_PROFILER.reset(profiler_token)
+            job.set_profile(profiler.collapsed())
+
+def _release_layouts(job: ProcessingJob):
+    """Libera i layout a livello di parola delle pagine OCR: servono solo alla
+    ricostruzione della struttura, il job terminato resta in memoria per ore"""
+    for page_info in job.ocr_pages:
+        page_info.set_layout(None)
+
+async def _export_formats(
+    job: ProcessingJob,
+    structured_content: Dict[str, Any],
+    dsa_profile: DSAProfile,
+    output_formats: List[str],
+    output_directory: str,
+    reporter: Optional[JobProgressReporter] = None,
+    name_suffix: str = ''
+) -> List[str]:
+    """Esporta il contenuto strutturato di un job in ciascun formato richiesto"""
+    file_name = Path(job.file_name)
+    file_name = f"{file_name.stem}{name_suffix}{file_name.suffix}"
+    output_files = []
+    for i, format_type in enumerate(output_formats):
+        job.cancel_token.raise_if_cancelled()
+        with metrics.EXPORT_DURATION.time(format_type), job.trace.span(f"export_{format_type}", 'export'):
+            output_path = await export_manager.export_document(
+                structured_content,
+                dsa_profile,
+                format_type,
+                output_directory,
+                file_name
+            )
+        output_files.append(output_path)
+        if reporter:
+            reporter.step(i + 1, len(output_formats))
+    return output_files
+
+@app.post("/job/{job_id}/export")
+async def export_job(job_id: str, request: ExportRequest):
+    """Riesporta un job completato con altri profili o formati, senza rielaborare il PDF"""
+    if job_id not in processing_jobs:
+        raise HTTPException(status_code=404, detail="Job non trovato")
+    
+    job = processing_jobs[job_id]
+    if job.status != 'completed':
+        raise HTTPException(status_code=409, detail="Il job non è completato")
+    
+    structured_content = job_contents.get(job_id)
+    if structured_content is None:
+        raise HTTPException(status_code=410, detail="Contenuto non più disponibile: rielaborare il PDF")
+    
+    try:
+        output_files = await _export_formats(
+            job,
+            structured_content,
+            request.dsa_profile,
+            request.output_formats,
+            request.output_directory,
+            # Il profilo nel nome evita di sovrascrivere gli export precedenti
+            name_suffix=f"_{request.dsa_profile.id}"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Errore nell'export: {str(e)}")
+    
+    return {"job_id": job.id, "dsa_profile": request.dsa_profile.id, "output_files": output_files}
+
+def _reader_index_path(job_id: str) -> str:
+    """Indice del lettore HTML prodotto dall'elaborazione del job"""
+    if job_id not in processing_jobs:
+        raise HTTPException(status_code=404, detail="Job non trovato")
+    
+    job = processing_jobs[job_id]
+    if job.status != 'completed':
+        raise HTTPException(status_code=409, detail="Il job non è completato")
+    
+    index_path = next((path for path in job.output_files or [] if is_reader_index(path)), None)
+    if index_path is None:
+        raise HTTPException(status_code=404, detail="Lettore non disponibile: elaborare il PDF con il formato html")
+    if not os.path.exists(index_path):
+        raise HTTPException(status_code=410, detail="File del lettore non più disponibili")
+    return index_path
+
+@app.get("/job/{job_id}/reader")
+async def get_reader_index(job_id: str):
+    """Indice del lettore HTML (titolo, CSS del profilo, blocchi con titolo, offset e dimensione)"""
+    index_path = _reader_index_path(job_id)
+    return await asyncio.to_thread(reader_store.index, index_path)
+
+@app.get("/job/{job_id}/reader/chunks")
+async def get_reader_chunks(job_id: str, start: int = 0, count: int = READER_PAGE_SIZE):
+    """HTML dei blocchi da start a start + count - 1: il lettore carica solo quelli visibili"""
+    index_path = _reader_index_path(job_id)
+    try:
+        return await asyncio.to_thread(reader_store.chunks, index_path, start, count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/job-status/{job_id}")
 async def get_job_status(job_id: str):
@@ -191,28 +707,215 @@ async def get_job_status(job_id: str):
         job_id=job.id,
         status=job.status,
         progress=job.progress,
+        stage=job.stage,
+        pages_done=job.pages_done,
+        pages_total=job.pages_total,
+        stage_timings=job.stage_timings,
+        ocr_pages=job.ocr_pages,
+        readability=job.readability,
         error=job.error,
         output_files=job.output_files
     )
 
+def _sse_message(event: Dict[str, Any]) -> str:
+    """Formatta un evento secondo il protocollo Server-Sent Events"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+def _event_stream_response(
+    request: Request,
+    job_ids: Optional[set],
+    is_finished: Optional[Callable[[], bool]] = None,
+    batch: Optional[ProcessingBatch] = None
+) -> StreamingResponse:
+    """Crea uno stream SSE con lo stato iniziale e gli aggiornamenti dei job"""
+    topics = job_ids | {batch.id} if batch and job_ids is not None else job_ids
+    queue = job_events.subscribe(topics)
+    
+    async def event_stream():
+        try:
+            # Stato iniziale, così il client non deve interrogare /job-status
+            for job in list(processing_jobs.values()):
+                if job_ids is None or job.id in job_ids:
+                    yield _sse_message(job_event(job, 'snapshot'))
+            if batch:
+                yield _sse_message(_batch_event(batch))
+            
+            # Lo stream termina da sé quando tutto ciò che segue è concluso
+            while not (is_finished and is_finished()):
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield _sse_message(event)
+            
+            # Invia gli eventi rimasti in coda prima di chiudere
+            while not queue.empty():
+                yield _sse_message(queue.get_nowait())
+        finally:
+            job_events.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _jobs_finished(job_ids: set) -> Callable[[], bool]:
+    """Condizione di chiusura di uno stream: tutti i job indicati sono terminati"""
+    def finished() -> bool:
+        return all(
+            job_id not in processing_jobs or processing_jobs[job_id].status not in ('pending', 'processing')
+            for job_id in job_ids
+        )
+    return finished
+
+@app.get("/job/{job_id}/events")
+async def job_events_stream(job_id: str, request: Request):
+    """Stream SSE dell'avanzamento di un job; si chiude al termine del job"""
+    if job_id not in processing_jobs:
+        raise HTTPException(status_code=404, detail="Job non trovato")
+    
+    return _event_stream_response(request, {job_id}, _jobs_finished({job_id}))
+
+@app.get("/events")
+async def events_stream(request: Request, job_ids: Optional[str] = None):
+    """Stream SSE dell'avanzamento di più job (separati da virgola) o di tutti i job"""
+    if not job_ids:
+        return _event_stream_response(request, None)
+    
+    selected = {job_id for job_id in job_ids.split(',') if job_id}
+    return _event_stream_response(request, selected, _jobs_finished(selected))
+
+@app.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Stato aggregato e manifest di un batch"""
+    if batch_id not in processing_batches:
+        raise HTTPException(status_code=404, detail="Batch non trovato")
+    
+    return _batch_manifest(processing_batches[batch_id])
+
+@app.get("/batch/{batch_id}/events")
+async def batch_events_stream(batch_id: str, request: Request):
+    """Stream SSE dei job di un batch e del suo avanzamento aggregato"""
+    if batch_id not in processing_batches:
+        raise HTTPException(status_code=404, detail="Batch non trovato")
+    
+    batch = processing_batches[batch_id]
+    return _event_stream_response(
+        request,
+        set(batch.job_ids),
+        lambda: batch.status in ('completed', 'error', 'cancelled'),
+        batch=batch
+    )
+
+@app.get("/job/{job_id}/trace")
+async def get_job_trace(job_id: str):
+    """Timeline del job in formato Chrome trace-event (chrome://tracing, Perfetto)"""
+    if job_id not in processing_jobs:
+        raise HTTPException(status_code=404, detail="Job non trovato")
+    
+    job = processing_jobs[job_id]
+    return JSONResponse(
+        job.trace.to_chrome_trace(process_name=job.file_name),
+        headers={"Content-Disposition": f'attachment; filename="trace_{job.id}.json"'}
+    )
+
+@app.get("/job/{job_id}/profile")
+async def get_job_profile(job_id: str):
+    """Stack campionati del job (collapsed stacks per flamegraph.pl / speedscope)"""
+    if job_id not in processing_jobs:
+        raise HTTPException(status_code=404, detail="Job non trovato")
+    
+    job = processing_jobs[job_id]
+    if job.profile is None:
+        raise HTTPException(status_code=404, detail="Profilo non disponibile: avviare il job con enable_profiling")
+    
+    return PlainTextResponse(
+        job.profile,
+        headers={"Content-Disposition": f'attachment; filename="profile_{job.id}.folded"'}
+    )
+
 @app.get("/jobs")
-async def list_jobs():
-    """Lista tutti i job"""
-    return [job.dict() for job in processing_jobs.values()]
+async def list_jobs(
+    status: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 50
+):
+    """Lista paginata dei job, filtrabile per stato e per batch (dal più recente)"""
+    processing_jobs.prune()
+    
+    statuses = set(status.split(',')) if status else None
+    jobs = [
+        job for job in processing_jobs.values()
+        if (statuses is None or job.status in statuses)
+        and (batch_id is None or job.batch_id == batch_id)
+    ]
+    jobs.sort(key=lambda job: job.created_at, reverse=True)
+    
+    offset = max(0, offset)
+    limit = min(max(1, limit), MAX_JOBS_PAGE_SIZE)
+    return {
+        "total": len(jobs),
+        "offset": offset,
+        "limit": limit,
+        "items": [job_summary(job) for job in jobs[offset:offset + limit]]
+    }
+
+def _cancel_job(job: ProcessingJob) -> bool:
+    """Richiede l'annullamento di un job attivo; restituisce False se è già terminato"""
+    if job.status not in ('pending', 'processing'):
+        return False
+    
+    job.cancel_token.cancel()
+    if job.status == 'pending':
+        # Non ancora avviato: il task in background si fermerà al primo controllo
+        job.status = 'cancelled'
+        job.finished_at = time.time()
+        job_events.publish(job.id, job_event(job, 'cancelled'))
+    return True
+
+@app.post("/job/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Annulla un job: i worker si fermano entro la pagina in corso"""
+    if job_id not in processing_jobs:
+        raise HTTPException(status_code=404, detail="Job non trovato")
+    
+    if not _cancel_job(processing_jobs[job_id]):
+        raise HTTPException(status_code=409, detail="Il job è già terminato")
+    
+    return {"message": "Annullamento richiesto"}
+
+@app.post("/batch/{batch_id}/cancel")
+async def cancel_batch(batch_id: str):
+    """Annulla tutti i job ancora attivi di un batch"""
+    if batch_id not in processing_batches:
+        raise HTTPException(status_code=404, detail="Batch non trovato")
+    
+    cancelled = [job.id for job in _batch_jobs(processing_batches[batch_id]) if _cancel_job(job)]
+    return {"message": "Annullamento richiesto", "job_ids": cancelled}
 
 @app.delete("/job/{job_id}")
 async def delete_job(job_id: str):
-    """Elimina un job"""
+    """Elimina un job, annullandolo se è ancora in corso"""
     if job_id not in processing_jobs:
         raise HTTPException(status_code=404, detail="Job non trovato")
     
     job = processing_jobs[job_id]
     
-    # Pulisci il file temporaneo se esiste
-    if os.path.exists(job.file_path):
-        os.unlink(job.file_path)
+    if job.status == 'processing':
+        # Il file temporaneo viene rimosso dal task stesso quando si ferma
+        _cancel_job(job)
+    else:
+        job.cancel_token.cancel()
+        _cleanup_job_file(job)
     
     del processing_jobs[job_id]
+    job_contents.discard(job_id)
     return {"message": "Job eliminato"}
 
 @app.get("/dsa-profiles")
@@ -278,5 +981,9 @@ async def get_dsa_profiles():
     ]
 
 if __name__ == "__main__":
+    # Necessario nel binario PyInstaller per i processi del pool di estrazione
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,23 @@
+import threading
+
+class JobCancelledError(Exception):
+    """Sollevata quando un job viene annullato durante l'elaborazione"""
+
+class CancelToken:
+    """Segnale di annullamento condiviso tra l'event loop e i worker del pool"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Richiede l'annullamento: i worker si fermano al prossimo controllo"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Interrompe l'elaborazione se l'annullamento è stato richiesto"""
+        if self._event.is_set():
+            raise JobCancelledError("Job annullato")
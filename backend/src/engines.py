@@ -0,0 +1,68 @@
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Moduli pesanti per motore: sono importati solo dove servono (import locali nei
+# componenti) e pre-caricati in background dopo l'avvio del server
+ENGINE_MODULES: Dict[str, List[str]] = {
+    'pdf': ['pdfplumber', 'pdfminer.high_level', 'pypdfium2', 'pdf2image'],
+    'ocr': ['numpy', 'cv2', 'PIL.Image', 'pytesseract'],
+    'text': ['ftfy'],
+    'export': ['docx', 'ebooklib.epub'],
+}
+
+class EngineWarmup:
+    """Pre-caricamento in background dei motori e stato di prontezza per /ready"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: Dict[str, Dict[str, Any]] = {
+            name: {'status': 'pending', 'load_seconds': None, 'error': None}
+            for name in ENGINE_MODULES
+        }
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(engine['status'] == 'ready' for engine in self._engines.values())
+
+    def load(self, name: str):
+        """Importa i moduli di un motore (bloccante: da eseguire fuori dall'event loop)"""
+        with self._lock:
+            self._engines[name]['status'] = 'loading'
+
+        started = time.perf_counter()
+        try:
+            for module in ENGINE_MODULES[name]:
+                importlib.import_module(module)
+            status, error = 'ready', None
+        except Exception as e:
+            logger.error(f"Errore nel caricamento del motore {name}: {e}")
+            status, error = 'error', str(e)
+
+        with self._lock:
+            self._engines[name].update(
+                status=status,
+                load_seconds=round(time.perf_counter() - started, 3),
+                error=error
+            )
+
+    async def warm_up(self):
+        """Carica tutti i motori uno alla volta in un thread separato"""
+        started = time.perf_counter()
+        for name in ENGINE_MODULES:
+            await asyncio.to_thread(self.load, name)
+        logger.info(f"Warm-up dei motori completato in {time.perf_counter() - started:.2f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            engines = {name: dict(engine) for name, engine in self._engines.items()}
+        return {
+            'ready': all(engine['status'] == 'ready' for engine in engines.values()),
+            'engines': engines,
+        }
@@ -1,27 +1,40 @@
+import asyncio
+import io
 import os
+from html import escape
 import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List
 import logging
 from datetime import datetime
 
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
-from docx.oxml.shared import OxmlElement, qn
 # weasyprint rimosso per problemi di dipendenze
-from ebooklib import epub
-from bs4 import BeautifulSoup
+# python-docx ed ebooklib sono importati solo al primo export (avvio più rapido)
 
+from . import metrics
+from .html_reader import HTMLSection, write_reader
 from .models import DSAProfile, ExportResult
 
+if TYPE_CHECKING:
+    from docx.document import Document
+
 logger = logging.getLogger(__name__)
 
+# Numero massimo di profili DSA "compilati" (template DOCX, CSS) tenuti in cache
+PROFILE_CACHE_SIZE = 32
+
 class ExportManager:
     def __init__(self):
         self.fonts_path = Path(__file__).parent.parent.parent / "assets" / "fonts"
         self.templates_path = Path(__file__).parent.parent.parent / "assets" / "templates"
+        
+        # Cache per profilo: i batch riusano stili e CSS invece di ricalcolarli per ogni file
+        self._docx_templates: OrderedDict[str, bytes] = OrderedDict()
+        self._css_cache: OrderedDict[str, str] = OrderedDict()
+        # Gli export girano in thread: le cache LRU sono condivise tra job
+        self._cache_lock = threading.Lock()
     
     async def export_document(
         self,
@@ -31,7 +44,22 @@ class ExportManager:
         output_directory: str,
         original_filename: str
     ) -> str:
-        """Esporta il documento nel formato specificato"""
+        """Esporta il documento nel formato specificato
+        
+        La generazione del file gira in un thread, senza bloccare il loop.
+        """
+        return await asyncio.to_thread(
+            self._export_document, structured_content, dsa_profile, format_type, output_directory, original_filename
+        )
+    
+    def _export_document(
+        self,
+        structured_content: Dict[str, Any],
+        dsa_profile: DSAProfile,
+        format_type: str,
+        output_directory: str,
+        original_filename: str
+    ) -> str:
         try:
             # Crea la directory di output se non esiste
             os.makedirs(output_directory, exist_ok=True)
@@ -41,15 +69,19 @@ class ExportManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             if format_type == 'docx':
-                return await self._export_docx(
+                return self._export_docx(
                     structured_content, dsa_profile, output_directory, base_name, timestamp
                 )
             elif format_type == 'pdf':
-                return await self._export_pdf(
+                return self._export_pdf(
                     structured_content, dsa_profile, output_directory, base_name, timestamp
                 )
             elif format_type == 'epub':
-                return await self._export_epub(
+                return self._export_epub(
+                    structured_content, dsa_profile, output_directory, base_name, timestamp
+                )
+            elif format_type == 'html':
+                return self._export_html_reader(
                     structured_content, dsa_profile, output_directory, base_name, timestamp
                 )
             else:
@@ -59,7 +91,7 @@ class ExportManager:
             logger.error(f"Errore nell'export {format_type}: {e}")
             raise
     
-    async def _export_docx(
+    def _export_docx(
         self,
         structured_content: Dict[str, Any],
         dsa_profile: DSAProfile,
@@ -68,12 +100,11 @@ class ExportManager:
         timestamp: str
     ) -> str:
         """Esporta in formato DOCX"""
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        
         try:
-            # Crea un nuovo documento
-            doc = Document()
-            
-            # Configura gli stili
-            self._setup_docx_styles(doc, dsa_profile)
+            # Crea un nuovo documento con gli stili del profilo già configurati
+            doc = self._new_docx_document(dsa_profile)
             
             # Aggiungi il titolo
             if structured_content.get('title'):
@@ -119,8 +150,45 @@ class ExportManager:
             logger.error(f"Errore nell'export DOCX: {e}")
             raise
     
-    def _setup_docx_styles(self, doc: Document, dsa_profile: DSAProfile):
+    def _new_docx_document(self, dsa_profile: DSAProfile) -> 'Document':
+        """Crea un documento DOCX dal template compilato per il profilo"""
+        from docx import Document
+        
+        key = dsa_profile.json()
+        template = self._cache_get(self._docx_templates, key, 'docx_template')
+        if template is None:
+            doc = Document()
+            self._setup_docx_styles(doc, dsa_profile)
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            template = buffer.getvalue()
+            self._cache_put(self._docx_templates, key, template)
+        
+        return Document(io.BytesIO(template))
+    
+    def _cache_get(self, cache: OrderedDict, key: str, cache_name: str):
+        """Legge da una cache LRU per profilo"""
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+        metrics.record_cache_access(cache_name, value is not None)
+        return value
+    
+    def _cache_put(self, cache: OrderedDict, key: str, value):
+        """Inserisce in una cache LRU per profilo, eliminando le voci più vecchie"""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > PROFILE_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def _setup_docx_styles(self, doc: 'Document', dsa_profile: DSAProfile):
         """Configura gli stili DOCX per il profilo DSA"""
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Pt
+        
         styles = doc.styles
         
         # Stile per il corpo del testo
@@ -144,7 +212,7 @@ class ExportManager:
             heading_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
             heading_para.space_after = Pt(dsa_profile.paragraphSpacing * 1.5)
     
-    async def _export_pdf(
+    def _export_pdf(
         self,
         structured_content: Dict[str, Any],
         dsa_profile: DSAProfile,
@@ -155,26 +223,11 @@ class ExportManager:
         """Esporta in formato PDF (temporaneamente disabilitato)"""
         try:
             # Per ora, crea un file HTML che può essere convertito in PDF manualmente
-            html_content = self._generate_html(structured_content, dsa_profile)
-            css_content = self._generate_pdf_css(dsa_profile)
+            full_html = self.render_html(structured_content, dsa_profile)
             
             # Salva come HTML
             output_path = os.path.join(output_directory, f"{base_name}_DSA_{timestamp}.html")
             
-            full_html = f"""
-<!DOCTYPE html>
-<html lang="it">
-<head>
-    <meta charset="UTF-8">
-    <title>{structured_content.get('title', 'Documento DSA')}</title>
-    <style>{css_content}</style>
-</head>
-<body>
-{html_content}
-</body>
-</html>
-            """
-            
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(full_html)
             
@@ -185,44 +238,99 @@ class ExportManager:
             logger.error(f"Errore nell'export PDF: {e}")
             raise
     
+    def _export_html_reader(
+        self,
+        structured_content: Dict[str, Any],
+        dsa_profile: DSAProfile,
+        output_directory: str,
+        base_name: str,
+        timestamp: str
+    ) -> str:
+        """Esporta il lettore HTML a blocchi per sezione (restituisce il percorso dell'indice)"""
+        try:
+            reader_directory = os.path.join(output_directory, f"{base_name}_DSA_{timestamp}_html")
+            index_path = write_reader(
+                self._generate_html_sections(structured_content),
+                structured_content.get('title') or base_name,
+                self._get_pdf_css(dsa_profile),
+                reader_directory
+            )
+            
+            logger.info(f"Lettore HTML esportato: {reader_directory}")
+            return index_path
+            
+        except Exception as e:
+            logger.error(f"Errore nell'export HTML: {e}")
+            raise
+    
+    def render_html(self, structured_content: Dict[str, Any], dsa_profile: DSAProfile) -> str:
+        """Pagina HTML autonoma con il CSS del profilo (export HTML e anteprima)"""
+        title = escape(structured_content.get('title') or 'Documento DSA')
+        body = '\n'.join(self._generate_html_body(structured_content))
+        return f"""<!DOCTYPE html>
+<html lang="it">
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>{self._get_pdf_css(dsa_profile)}</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+    
     def _generate_html(self, structured_content: Dict[str, Any], dsa_profile: DSAProfile) -> str:
         """Genera HTML dal contenuto strutturato"""
         html_parts = ['<!DOCTYPE html>', '<html lang="it">', '<head>', '<meta charset="UTF-8">', '</head>', '<body>']
-        
+        html_parts.extend(self._generate_html_body(structured_content))
+        html_parts.extend(['</body>', '</html>'])
+        return '\n'.join(html_parts)
+    
+    def _generate_html_body(self, structured_content: Dict[str, Any]) -> List[str]:
+        """Elementi HTML del contenuto (testo con escape: arriva dal PDF)"""
+        return [part for _, _, parts in self._generate_html_sections(structured_content) for part in parts]
+    
+    def _generate_html_sections(self, structured_content: Dict[str, Any]) -> Iterator[HTMLSection]:
+        """Elementi HTML raggruppati per sezione, come (titolo, livello, elementi)"""
         # Aggiungi il titolo
         if structured_content.get('title'):
-            html_parts.append(f'<h1>{structured_content["title"]}</h1>')
+            title = structured_content['title']
+            yield title, 1, [f'<h1>{escape(title)}</h1>']
         
         # Aggiungi le sezioni
         for section in structured_content.get('sections', []):
             level = min(section['level'], 6)
-            html_parts.append(f'<h{level}>{section["title"]}</h{level}>')
+            html_parts = [f'<h{level}>{escape(section["title"])}</h{level}>']
             
             for content_line in section['content']:
                 if content_line.strip():
-                    html_parts.append(f'<p>{content_line}</p>')
+                    html_parts.append(f'<p>{escape(content_line)}</p>')
+            yield section['title'], level, html_parts
         
         # Aggiungi i paragrafi
-        for paragraph in structured_content.get('paragraphs', []):
-            if paragraph.strip():
-                html_parts.append(f'<p>{paragraph}</p>')
+        html_parts = [f'<p>{escape(paragraph)}</p>' for paragraph in structured_content.get('paragraphs', []) if paragraph.strip()]
+        if html_parts:
+            yield '', 1, html_parts
         
-        # Aggiungi gli elenchi
+        # Aggiungi gli elenchi (un elemento per elenco: i blocchi del lettore non li spezzano)
+        html_parts = []
         for list_item in structured_content.get('lists', []):
             if list_item['items']:
-                if list_item['type'] == 'bullet':
-                    html_parts.append('<ul>')
-                    for item in list_item['items']:
-                        html_parts.append(f'<li>{item["text"]}</li>')
-                    html_parts.append('</ul>')
-                else:
-                    html_parts.append('<ol>')
-                    for item in list_item['items']:
-                        html_parts.append(f'<li>{item["text"]}</li>')
-                    html_parts.append('</ol>')
-        
-        html_parts.extend(['</body>', '</html>'])
-        return '\n'.join(html_parts)
+                tag = 'ul' if list_item['type'] == 'bullet' else 'ol'
+                items = [f'<li>{escape(item["text"])}</li>' for item in list_item['items']]
+                html_parts.append('\n'.join([f'<{tag}>', *items, f'</{tag}>']))
+        if html_parts:
+            yield '', 1, html_parts
+    
+    def _get_pdf_css(self, dsa_profile: DSAProfile) -> str:
+        """Restituisce il CSS del profilo, generandolo una sola volta"""
+        key = dsa_profile.json()
+        css = self._cache_get(self._css_cache, key, 'profile_css')
+        if css is None:
+            css = self._generate_pdf_css(dsa_profile)
+            self._cache_put(self._css_cache, key, css)
+        return css
     
     def _generate_pdf_css(self, dsa_profile: DSAProfile) -> str:
         """Genera CSS per l'export PDF"""
@@ -269,7 +377,7 @@ class ExportManager:
         }}
         """
     
-    async def _export_epub(
+    def _export_epub(
         self,
         structured_content: Dict[str, Any],
         dsa_profile: DSAProfile,
@@ -278,6 +386,8 @@ class ExportManager:
         timestamp: str
     ) -> str:
         """Esporta in formato ePub"""
+        from ebooklib import epub
+        
         try:
             # Crea un nuovo libro ePub
             book = epub.EpubBook()
@@ -0,0 +1,148 @@
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from . import metrics
+from .sentences import iter_sentence_spans
+
+# Dimensione massima di un blocco: le sezioni più lunghe sono divise in più
+# blocchi, così la prima pagina del lettore non dipende dalla lunghezza del testo
+READER_CHUNK_CHARS = 32 * 1024
+
+# Blocchi restituiti di default per richiesta
+READER_PAGE_SIZE = 4
+READER_MAX_PAGE_SIZE = 32
+
+# Indici dei lettori tenuti in memoria
+READER_INDEX_CACHE_SIZE = 16
+
+INDEX_FILE = 'index.json'
+SECTIONS_FILE = 'sections.html'
+STYLE_FILE = 'style.css'
+
+# (titolo, livello, elementi HTML) di una sezione del documento
+HTMLSection = Tuple[str, int, List[str]]
+
+def _split_paragraph(part: str, max_chars: int) -> List[str]:
+    """Divide un paragrafo troppo lungo in più paragrafi, a fine frase"""
+    if len(part) <= max_chars or not (part.startswith('<p>') and part.endswith('</p>')):
+        return [part]
+    text = part[3:-4]
+    pieces = []
+    start = end = 0
+    for sentence_start, sentence_end in iter_sentence_spans(text):
+        if end > start and sentence_end - start > max_chars:
+            pieces.append(f'<p>{text[start:end]}</p>')
+            start = sentence_start
+        end = sentence_end
+    pieces.append(f'<p>{text[start:end]}</p>')
+    return pieces
+
+def _split_section(parts: List[str], max_chars: int) -> Iterable[List[str]]:
+    """Divide gli elementi di una sezione in gruppi di al massimo max_chars caratteri
+
+    Un elemento non viene mai spezzato, tranne i paragrafi più lunghi di
+    max_chars, divisi tra le frasi.
+    """
+    chunk: List[str] = []
+    size = 0
+    for part in (piece for element in parts for piece in _split_paragraph(element, max_chars)):
+        if chunk and size + len(part) > max_chars:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(part)
+        size += len(part) + 1
+    if chunk:
+        yield chunk
+
+def write_reader(
+    sections: Iterable[HTMLSection],
+    title: str,
+    css: str,
+    output_directory: str,
+    max_chunk_chars: int = READER_CHUNK_CHARS
+) -> str:
+    """Scrive il lettore HTML a blocchi e restituisce il percorso dell'indice
+
+    I blocchi sono concatenati in un unico file; l'indice ne riporta titolo,
+    livello, offset e dimensione in byte, quindi un blocco si legge con una
+    seek senza caricare il resto del documento.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    entries = []
+    offset = 0
+    with open(os.path.join(output_directory, SECTIONS_FILE), 'wb') as f:
+        for section_title, level, parts in sections:
+            for part_index, chunk in enumerate(_split_section(parts, max_chunk_chars)):
+                data = ('\n'.join(chunk) + '\n').encode('utf-8')
+                f.write(data)
+                entries.append({
+                    'title': section_title,
+                    'level': level,
+                    'continued': part_index > 0,
+                    'offset': offset,
+                    'size': len(data),
+                })
+                offset += len(data)
+
+    with open(os.path.join(output_directory, STYLE_FILE), 'w', encoding='utf-8') as f:
+        f.write(css)
+
+    index_path = os.path.join(output_directory, INDEX_FILE)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({'title': title, 'size': offset, 'chunks': entries}, f, ensure_ascii=False)
+    return index_path
+
+def is_reader_index(path: str) -> bool:
+    return os.path.basename(path) == INDEX_FILE
+
+class ReaderStore:
+    """Lettura paginata dei lettori HTML scritti da write_reader
+
+    Gli indici restano in una cache LRU (invalidata se il file cambia); ogni
+    pagina di blocchi contigui costa una seek e una lettura.
+    """
+
+    def __init__(self, cache_size: int = READER_INDEX_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._indexes: OrderedDict[Tuple[str, int], Dict[str, Any]] = OrderedDict()
+
+    def index(self, index_path: str) -> Dict[str, Any]:
+        key = (index_path, os.stat(index_path).st_mtime_ns)
+        index = self._indexes.get(key)
+        metrics.record_cache_access('reader_index', index is not None)
+        if index is None:
+            with open(index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            with open(os.path.join(os.path.dirname(index_path), STYLE_FILE), encoding='utf-8') as f:
+                index['css'] = f.read()
+            self._indexes[key] = index
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(key)
+        return index
+
+    def chunks(self, index_path: str, start: int = 0, count: int = READER_PAGE_SIZE) -> Dict[str, Any]:
+        """Blocchi da start a start + count - 1, con il loro HTML"""
+        entries = self.index(index_path)['chunks']
+        if start < 0 or count < 1 or (entries and start >= len(entries)):
+            raise ValueError(f"Intervallo di blocchi non valido: {start}+{count} ({len(entries)} blocchi)")
+        selected = entries[start:start + min(count, READER_MAX_PAGE_SIZE)]
+
+        chunks = []
+        if selected:
+            begin = selected[0]['offset']
+            with open(os.path.join(os.path.dirname(index_path), SECTIONS_FILE), 'rb') as f:
+                f.seek(begin)
+                data = f.read(selected[-1]['offset'] + selected[-1]['size'] - begin)
+            for position, entry in enumerate(selected, start):
+                relative = entry['offset'] - begin
+                chunks.append({
+                    'id': position,
+                    'title': entry['title'],
+                    'level': entry['level'],
+                    'html': data[relative:relative + entry['size']].decode('utf-8'),
+                })
+
+        return {'start': start, 'total': len(entries), 'chunks': chunks}
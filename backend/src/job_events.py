@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from . import metrics
+from .models import ProcessingJob
+
+logger = logging.getLogger(__name__)
+
+# Intervalli di avanzamento (in %) assegnati a ciascuna fase dell'elaborazione
+STAGE_PROGRESS = {
+    'analyze': (0, 10),
+    'extract': (10, 60),
+    'normalize': (60, 70),
+    'structure': (70, 80),
+    'export': (80, 100),
+}
+
+class JobEventBus:
+    """Distribuisce gli eventi dei job ai client in ascolto (SSE)"""
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: List[Tuple[Optional[Set[str]], asyncio.Queue]] = []
+
+    def subscribe(self, job_ids: Optional[Set[str]] = None) -> asyncio.Queue:
+        """Registra un nuovo ascoltatore, opzionalmente filtrato per job"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.append((job_ids, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Rimuove un ascoltatore"""
+        self._subscribers = [(ids, q) for ids, q in self._subscribers if q is not queue]
+
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        """Invia un evento a tutti gli ascoltatori interessati al job"""
+        for job_ids, queue in self._subscribers:
+            if job_ids is not None and job_id not in job_ids:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Client troppo lento: scarta l'evento, il successivo riporta lo stato completo
+                logger.warning(f"Coda eventi piena, evento scartato per il job {job_id}")
+
+class JobProgressReporter:
+    """Aggiorna fase, avanzamento e tempi di un job e li pubblica sul bus"""
+
+    def __init__(self, job: ProcessingJob, event_bus: JobEventBus):
+        self.job = job
+        self.event_bus = event_bus
+        self.started_at = time.monotonic()
+        self._stage_started_at: Optional[float] = None
+        self._stage_span_start: Optional[float] = None
+
+    def stage(self, name: str):
+        """Chiude la fase corrente e ne apre una nuova"""
+        self._close_stage()
+        self.job.stage = name
+        self.job.progress = STAGE_PROGRESS[name][0]
+        self._stage_started_at = time.monotonic()
+        self._stage_span_start = self.job.trace.now()
+        self.publish('stage')
+
+    def pages(self, done: int, total: int):
+        """Aggiorna l'avanzamento per pagina della fase corrente"""
+        self.job.pages_done = done
+        self.job.pages_total = total
+        self._advance(done, total)
+        self.publish('progress')
+
+    def step(self, done: int, total: int):
+        """Aggiorna l'avanzamento di una fase suddivisa in passi (es. formati di export)"""
+        self._advance(done, total)
+        self.publish('progress')
+
+    def finish(self, status: str):
+        """Chiude l'ultima fase e pubblica lo stato finale del job"""
+        self._close_stage()
+        self.job.status = status
+        self.job.finished_at = time.time()
+        if status == 'completed':
+            self.job.progress = 100
+        metrics.JOBS_FINISHED.inc(1, status)
+        self.publish(status)
+
+    def publish(self, event_type: str):
+        """Pubblica lo stato corrente del job"""
+        self.event_bus.publish(self.job.id, job_event(self.job, event_type, self.pages_per_second()))
+
+    def pages_per_second(self) -> Optional[float]:
+        """Throughput della fase di estrazione"""
+        extract_time = self.job.stage_timings.get('extract')
+        if extract_time is None and self.job.stage == 'extract' and self._stage_started_at:
+            extract_time = time.monotonic() - self._stage_started_at
+        if not extract_time or not self.job.pages_done:
+            return None
+        return round(self.job.pages_done / extract_time, 3)
+
+    def _advance(self, done: int, total: int):
+        if not self.job.stage or total <= 0:
+            return
+        start, end = STAGE_PROGRESS[self.job.stage]
+        self.job.progress = start + int((end - start) * min(done, total) / total)
+
+    def _close_stage(self):
+        if self.job.stage and self._stage_started_at is not None:
+            elapsed = time.monotonic() - self._stage_started_at
+            self.job.stage_timings[self.job.stage] = round(elapsed, 3)
+            metrics.STAGE_DURATION.observe(elapsed, self.job.stage)
+            self.job.trace.add_span(self.job.stage, 'stage', self._stage_span_start)
+        self._stage_started_at = None
+
+def job_event(job: ProcessingJob, event_type: str, pages_per_second: Optional[float] = None) -> Dict[str, Any]:
+    """Rappresentazione compatta di un job inviata ai client"""
+    return {
+        'type': event_type,
+        'job_id': job.id,
+        'file_name': job.file_name,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'pages_done': job.pages_done,
+        'pages_total': job.pages_total,
+        'pages_per_second': pages_per_second,
+        'stage_timings': dict(job.stage_timings),
+        'error': job.error,
+        'output_files': job.output_files,
+        'timestamp': time.time(),
+    }
@@ -0,0 +1,178 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stati in cui un job (o un batch) non viene più aggiornato
+FINISHED_STATUSES = ('completed', 'error', 'cancelled')
+
+class JobStore:
+    """Store in memoria di job o batch con retention dei terminati (TTL + LRU)
+
+    Gli elementi attivi non vengono mai rimossi; quelli terminati scadono dopo
+    `ttl_seconds` e, oltre `max_finished`, vengono eliminati i meno usati.
+    Gli elementi per cui `is_pinned` è vero (es. job di un batch ancora in
+    corso) restano fino alla potatura successiva.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 6 * 3600,
+        max_finished: int = 500,
+        prune_interval: float = 30.0,
+        is_pinned: Optional[Callable[[Any], bool]] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self.prune_interval = prune_interval
+        self.is_pinned = is_pinned
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self._last_prune = 0.0
+
+    def __setitem__(self, item_id: str, item: Any):
+        self._items[item_id] = item
+        self._items.move_to_end(item_id)
+        self.prune()
+
+    def __getitem__(self, item_id: str) -> Any:
+        item = self._items[item_id]
+        # Un elemento consultato diventa il più recente ai fini dell'LRU
+        self._items.move_to_end(item_id)
+        return item
+
+    def __delitem__(self, item_id: str):
+        del self._items[item_id]
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._items))
+
+    def get(self, item_id: str, default: Any = None) -> Any:
+        return self[item_id] if item_id in self._items else default
+
+    def peek(self, item_id: str, default: Any = None) -> Any:
+        """Come get, ma senza aggiornare l'ordine LRU"""
+        return self._items.get(item_id, default)
+
+    def values(self) -> List[Any]:
+        """Copia degli elementi, dal meno al più recentemente usato"""
+        return list(self._items.values())
+
+    def prune(self, force: bool = False):
+        """Rimuove gli elementi terminati scaduti o in eccesso"""
+        now = time.time()
+        if not force and now - self._last_prune < self.prune_interval and len(self._items) <= self.max_finished:
+            return
+        self._last_prune = now
+
+        finished = [
+            (item_id, item) for item_id, item in self._items.items()
+            if item.status in FINISHED_STATUSES and not (self.is_pinned and self.is_pinned(item))
+        ]
+
+        evicted = 0
+        for item_id, item in finished:
+            finished_at = getattr(item, 'finished_at', None) or now
+            if now - finished_at > self.ttl_seconds:
+                del self._items[item_id]
+                evicted += 1
+
+        # I terminati sono in ordine LRU: si eliminano i primi in eccesso
+        excess = len(finished) - evicted - self.max_finished
+        for item_id, _ in finished:
+            if excess <= 0:
+                break
+            if item_id in self._items:
+                del self._items[item_id]
+                evicted += 1
+                excess -= 1
+
+        if evicted:
+            logger.info(f"Retention: rimossi {evicted} elementi terminati")
+
+def job_summary(job: Any) -> Dict[str, Any]:
+    """Rappresentazione compatta di un job per le liste (senza serializzazione pydantic)"""
+    return {
+        'id': job.id,
+        'file_name': job.file_name,
+        'batch_id': job.batch_id,
+        'status': job.status,
+        'progress': job.progress,
+        'stage': job.stage,
+        'pages_total': job.pages_total,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+        'error': job.error,
+    }
+
+def content_size(value: Any) -> int:
+    """Dimensione stimata di un contenuto strutturato: caratteri di testo contenuti"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(content_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(content_size(item) for item in value)
+    return 0
+
+class ContentStore:
+    """Contenuti strutturati dei job completati, per riesportarli senza rielaborare il PDF
+
+    LRU limitato nel numero di documenti e nei caratteri complessivi; i
+    contenuti più vecchi di `ttl_seconds` scadono alla prima consultazione.
+    """
+
+    def __init__(self, max_items: int = 100, max_chars: int = 50_000_000, ttl_seconds: float = 6 * 3600):
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.ttl_seconds = ttl_seconds
+        # job_id -> (contenuto, caratteri, istante di inserimento)
+        self._items: OrderedDict[str, tuple] = OrderedDict()
+        self._chars = 0
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def chars(self) -> int:
+        return self._chars
+
+    def put(self, job_id: str, content: Dict[str, Any]):
+        self.discard(job_id)
+        size = content_size(content)
+        if size > self.max_chars:
+            logger.info(f"Contenuto del job {job_id} troppo grande per la riesportazione ({size} caratteri)")
+            return
+        self._items[job_id] = (content, size, time.time())
+        self._chars += size
+
+        while len(self._items) > self.max_items or self._chars > self.max_chars:
+            evicted_id = next(iter(self._items))
+            self.discard(evicted_id)
+            logger.info(f"Retention: contenuto del job {evicted_id} rimosso")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._items.get(job_id)
+        if entry is None:
+            return None
+        content, _, stored_at = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            self.discard(job_id)
+            return None
+        self._items.move_to_end(job_id)
+        return content
+
+    def discard(self, job_id: str):
+        entry = self._items.pop(job_id, None)
+        if entry is not None:
+            self._chars -= entry[1]
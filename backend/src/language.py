@@ -0,0 +1,54 @@
+import re
+from typing import Dict, Optional
+
+# Modelli Tesseract supportati per il riconoscimento della lingua
+SINGLE_LANGUAGES = ('ita', 'eng')
+MIXED_LANGUAGE = 'ita+eng'
+
+# Parole funzionali frequenti ed esclusive di ciascuna lingua (escluse quelle
+# ambigue come "a", "in", "i", "no", "se")
+STOPWORDS: Dict[str, frozenset] = {
+    'ita': frozenset({
+        'il', 'lo', 'la', 'gli', 'le', 'di', 'da', 'con', 'su', 'per', 'tra', 'fra',
+        'un', 'una', 'uno', 'del', 'della', 'dei', 'delle', 'degli', 'dello', 'nel',
+        'nella', 'nei', 'nelle', 'al', 'alla', 'ai', 'alle', 'dal', 'dalla', 'sul',
+        'sulla', 'che', 'non', 'è', 'e', 'sono', 'come', 'anche', 'più', 'ma', 'questo',
+        'questa', 'questi', 'sua', 'suo', 'loro', 'essere', 'ha', 'hanno', 'era', 'perché',
+        'quando', 'molto', 'ogni', 'dopo', 'ancora', 'cosa', 'mentre', 'quale', 'quindi',
+    }),
+    'eng': frozenset({
+        'the', 'of', 'and', 'to', 'is', 'that', 'for', 'with', 'as', 'on', 'by', 'this',
+        'are', 'be', 'was', 'from', 'at', 'or', 'an', 'it', 'which', 'not', 'have', 'has',
+        'were', 'their', 'can', 'will', 'would', 'there', 'been', 'they', 'we', 'you',
+        'what', 'when', 'more', 'these', 'also', 'into', 'than', 'its', 'only', 'other',
+        'some', 'such', 'each', 'should', 'because', 'how', 'about', 'while', 'where',
+    }),
+}
+
+_WORD_PATTERN = re.compile(r"[a-zàèéìíîòóùú]+")
+
+# Minimo di parole funzionali riconosciute per considerare affidabile la stima
+MIN_LANGUAGE_EVIDENCE = 5
+
+# Quota minima della lingua prevalente perché basti il modello singolo
+DOMINANT_LANGUAGE_SHARE = 0.85
+
+def language_scores(text: str) -> Dict[str, int]:
+    """Numero di parole funzionali di ciascuna lingua presenti nel testo"""
+    scores = {language: 0 for language in STOPWORDS}
+    for word in _WORD_PATTERN.findall(text.lower()):
+        for language, stopwords in STOPWORDS.items():
+            if word in stopwords:
+                scores[language] += 1
+    return scores
+
+def detect_language(text: str) -> Optional[str]:
+    """Modello Tesseract adatto al testo: 'ita', 'eng' o 'ita+eng' se le lingue
+    sono davvero mescolate; None se il testo non basta a decidere"""
+    scores = language_scores(text)
+    total = sum(scores.values())
+    if total < MIN_LANGUAGE_EVIDENCE:
+        return None
+
+    language, hits = max(scores.items(), key=lambda item: item[1])
+    return language if hits / total >= DOMINANT_LANGUAGE_SHARE else MIXED_LANGUAGE
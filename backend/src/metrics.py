@@ -0,0 +1,253 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Bucket (secondi) adatti sia alle fasi per pagina sia a quelle per documento
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """Base delle metriche: nome, descrizione, etichette e lock condiviso"""
+    metric_type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Sequence[str]) -> LabelValues:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name}: attese etichette {self.labelnames}, ricevute {labelvalues}")
+        return tuple(str(value) for value in labelvalues)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: str):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(_Metric):
+    """Gauge impostato esplicitamente o calcolato al momento dello scrape"""
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None
+
+    def set(self, value: float, *labelvalues: str):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, *labelvalues: str):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *labelvalues: str):
+        self.inc(-amount, *labelvalues)
+
+    def set_function(self, function: Callable[[], Union[float, Dict[LabelValues, float]]]):
+        """Calcola il valore solo quando /metrics viene letto (costo zero nel resto del tempo)"""
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            result = self._function()
+            items = list(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # Per ogni serie: conteggi per bucket (non cumulativi), somma, numero di osservazioni
+        self._series: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        key = self._key(labelvalues)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        """Misura la durata del blocco"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Raccolta delle metriche esposte in formato testo Prometheus"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    'pdf_dsa_stage_duration_seconds',
+    'Durata delle fasi della pipeline per documento',
+    ['stage']
+)
+PAGE_STEP_DURATION = REGISTRY.histogram(
+    'pdf_dsa_page_step_duration_seconds',
+    'Durata dei passi eseguiti per singola pagina (rasterize, content_bounds, page_hash, orientation, preprocess, denoise, deskew, language, ocr, native_text)',
+    ['step']
+)
+EXPORT_DURATION = REGISTRY.histogram(
+    'pdf_dsa_export_duration_seconds',
+    'Durata dell\'export per formato',
+    ['format']
+)
+PAGES_PROCESSED = REGISTRY.counter(
+    'pdf_dsa_pages_processed_total',
+    'Pagine elaborate, per metodo di estrazione',
+    ['method']
+)
+JOBS_FINISHED = REGISTRY.counter(
+    'pdf_dsa_jobs_finished_total',
+    'Job terminati, per stato finale',
+    ['status']
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    'pdf_dsa_queue_depth',
+    'Job in attesa di elaborazione'
+)
+ACTIVE_JOBS = REGISTRY.gauge(
+    'pdf_dsa_active_jobs',
+    'Job in elaborazione'
+)
+OCR_PAGE_LANGUAGE = REGISTRY.counter(
+    'pdf_dsa_ocr_page_language_total',
+    'Pagine OCR per modello di lingua usato e origine della scelta (fixed, native, probe, fallback)',
+    ['language', 'source']
+)
+OCR_PAGE_CONFIDENCE = REGISTRY.histogram(
+    'pdf_dsa_ocr_page_confidence',
+    'Confidenza media delle parole per pagina OCR (0-100)',
+    buckets=(20, 40, 60, 70, 80, 90, 95, 100)
+)
+OCR_DUPLICATE_PAGES = REGISTRY.counter(
+    'pdf_dsa_ocr_duplicate_pages_total',
+    'Pagine uguali a una pagina già letta, con testo riusato senza OCR'
+)
+OCR_BLANK_PAGES = REGISTRY.counter(
+    'pdf_dsa_ocr_blank_pages_total',
+    'Pagine vuote saltate senza OCR'
+)
+OCR_PIXELS = REGISTRY.counter(
+    'pdf_dsa_ocr_pixels_total',
+    'Pixel delle pagine OCR, elaborati o esclusi (pagine vuote e margini)',
+    ['result']
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'pdf_dsa_cache_requests_total',
+    'Accessi alle cache interne, per esito (hit/miss)',
+    ['cache', 'result']
+)
+WORKER_POOL_SIZE = REGISTRY.gauge(
+    'pdf_dsa_worker_pool_size',
+    'Numero di worker del pool di elaborazione'
+)
+WORKER_POOL_BUSY = REGISTRY.gauge(
+    'pdf_dsa_worker_pool_busy',
+    'Worker del pool attualmente occupati'
+)
+WORKER_POOL_BUSY_SECONDS = REGISTRY.counter(
+    'pdf_dsa_worker_pool_busy_seconds_total',
+    'Tempo cumulativo di lavoro dei worker (utilizzo = rate / pool_size)'
+)
+
+def record_cache_access(cache: str, hit: bool):
+    """Registra un accesso a una cache per il calcolo dell'hit rate"""
+    CACHE_REQUESTS.inc(1, cache, 'hit' if hit else 'miss')
@@ -1,6 +1,11 @@
-from pydantic import BaseModel
-from typing import List, Optional, Literal
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, Dict, List, Optional, Literal
 from enum import Enum
+import time
+
+from .cancellation import CancelToken
+from .ocr_layout import PageLayout
+from .tracing import JobTrace
 
 class DSAProfile(BaseModel):
     id: str
@@ -16,22 +21,94 @@ class DSAProfile(BaseModel):
     paragraphSpacing: int
     linkColor: str
 
+class OCRPageInfo(BaseModel):
+    """Esito dell'OCR di una pagina"""
+    page_number: int
+    language: Optional[str]  # Modello Tesseract usato ('ita', 'eng', 'ita+eng'); None senza OCR
+    # fixed: scelta dall'utente; native/probe: stimata prima dell'OCR; previous:
+    # quella della pagina precedente, confermata dal testo; recognized: riletta
+    # nella lingua del testo; fallback: modello combinato; skipped: nessun OCR
+    language_source: Literal['fixed', 'native', 'probe', 'previous', 'recognized', 'fallback', 'skipped']
+    rotation: int = 0  # Rotazione oraria applicata prima dell'OCR (gradi)
+    blank: bool = False  # Pagina vuota, saltata senza OCR
+    duplicate_of: Optional[int] = None  # Pagina di cui è una copia (testo riusato senza OCR)
+    pixels_total: int = 0  # Pixel della pagina renderizzata
+    pixels_processed: int = 0  # Pixel passati a preprocessing e OCR dopo il ritaglio
+    confidence: Optional[float] = None  # Confidenza media delle parole (0-100)
+    word_count: int = 0
+    
+    # Parole con riquadri e confidenze, non serializzate nelle risposte
+    _layout: Optional[PageLayout] = PrivateAttr(default=None)
+    
+    @property
+    def layout(self) -> Optional[PageLayout]:
+        return self._layout
+    
+    def set_layout(self, layout: Optional[PageLayout]):
+        self._layout = layout
+
 class ProcessingJob(BaseModel):
     id: str
     file_path: str
     file_name: str
-    status: Literal['pending', 'processing', 'completed', 'error']
+    owns_file: bool = True  # False se file_path è il PDF originale dell'utente
+    batch_id: Optional[str] = None
+    status: Literal['pending', 'processing', 'completed', 'error', 'cancelled']
     progress: int
+    stage: Optional[str] = None
+    pages_done: int = 0
+    pages_total: int = 0
+    stage_timings: Dict[str, float] = {}
+    ocr_pages: List[OCRPageInfo] = []
+    readability: Optional[Dict[str, Any]] = None  # Indici Gulpease/Flesch-Vacca e conteggi del testo
     error: Optional[str] = None
     output_files: Optional[List[str]] = None
+    created_at: float = Field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    
+    # Stato di runtime, non serializzato
+    _cancel_token: CancelToken = PrivateAttr(default_factory=CancelToken)
+    _trace: JobTrace = PrivateAttr(default_factory=JobTrace)
+    _profile: Optional[str] = PrivateAttr(default=None)
+    
+    @property
+    def cancel_token(self) -> CancelToken:
+        return self._cancel_token
+    
+    @property
+    def trace(self) -> JobTrace:
+        return self._trace
+    
+    @property
+    def profile(self) -> Optional[str]:
+        """Stack campionati (formato collapsed) se il job è stato profilato"""
+        return self._profile
+    
+    def set_profile(self, collapsed_stacks: str):
+        self._profile = collapsed_stacks
+
+class ProcessingBatch(BaseModel):
+    id: str
+    job_ids: List[str]
+    status: Literal['pending', 'processing', 'completed', 'error', 'cancelled']
+    progress: int
+    manifest_path: Optional[str] = None
+    created_at: float = Field(default_factory=time.time)
+    finished_at: Optional[float] = None
 
 class ProcessingOptions(BaseModel):
     dsa_profile: DSAProfile
-    output_formats: List[Literal['docx', 'pdf', 'epub']]
+    output_formats: List[Literal['docx', 'pdf', 'epub', 'html']]
     output_directory: str
-    ocr_language: Literal['ita', 'eng', 'ita+eng'] = 'ita+eng'
+    ocr_language: Literal['auto', 'ita', 'eng', 'ita+eng'] = 'auto'  # auto: lingua scelta per pagina
     enable_deskew: bool = True
     enable_denoise: bool = True
+    detect_orientation: bool = True  # Raddrizza le pagine ruotate (stima su miniatura)
+    document_type: Literal['auto', 'single_column', 'sparse_text', 'slides'] = 'auto'  # Segmentazione OCR
+    crop_to_content: bool = True  # Salta le pagine vuote e ritaglia i margini prima dell'OCR
+    detect_duplicates: bool = True  # Riusa il testo delle pagine ripetute (hash e confronto a riquadri)
+    enable_profiling: bool = False  # Profiler a campionamento sul job (diagnostica)
+    text_backend: Optional[Literal['pdfium', 'pdfplumber']] = None  # None: PDFium se disponibile
 
 class PDFInfo(BaseModel):
     is_native: bool
@@ -0,0 +1,149 @@
+import functools
+import importlib.util
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import logging
+
+from .ocr_layout import PageLayout
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OCR_BACKENDS = ('tesserocr', 'pytesseract')
+
+@functools.lru_cache(maxsize=None)
+def tesserocr_available() -> bool:
+    """Vero se tesserocr è installato, senza importarlo (libtesseract si carica al primo OCR)"""
+    return importlib.util.find_spec('tesserocr') is not None
+
+class OCREngine:
+    """Esegue Tesseract su buffer in scala di grigi (uint8) senza ricodificarli
+
+    Con tesserocr (opzionale) il buffer passa direttamente a libtesseract e
+    ogni worker riusa la propria istanza già inizializzata per lingua/PSM.
+    Con pytesseract l'immagine viene scritta come PGM non compresso invece
+    del PNG predefinito.
+    """
+
+    def __init__(self, tesseract_path: Optional[str] = None, backend: Optional[str] = None):
+        if backend is not None and backend not in OCR_BACKENDS:
+            raise ValueError(f"Backend OCR non supportato: {backend}")
+
+        self.tesseract_path = tesseract_path
+        self.backend = backend or ('tesserocr' if tesserocr_available() else 'pytesseract')
+        self._local = threading.local()
+
+    @property
+    def tessdata_path(self) -> Optional[str]:
+        """Cartella dei modelli bundled (i .traineddata sono accanto al binario)"""
+        if not self.tesseract_path:
+            return None
+        folder = Path(self.tesseract_path).parent
+        return str(folder) if any(folder.glob('*.traineddata')) else None
+
+    def image_to_string(self, image: 'np.ndarray', language: str, psm: int = 3) -> str:
+        if self.backend == 'tesserocr':
+            return self._tesserocr_to_string(image, language, psm)
+        return self._pytesseract_to_string(image, language, psm)
+
+    def image_to_layout(self, image: 'np.ndarray', language: str, psm: int = 3) -> PageLayout:
+        """Parole con riquadri, id di riga e confidenze (TSV) in un'unica passata di riconoscimento"""
+        if self.backend == 'tesserocr':
+            return PageLayout.from_tsv(self._tesserocr_to_tsv(image, language, psm))
+        return PageLayout.from_tsv(self._pytesseract_to_tsv(image, language, psm))
+
+    def detect_orientation(self, image: 'np.ndarray') -> Tuple[int, float]:
+        """Rotazione oraria (0, 90, 180, 270) che raddrizza la pagina e relativa confidenza (OSD)"""
+        if self.backend == 'tesserocr':
+            import numpy as np
+
+            api = self._tesserocr_api('osd', 0)  # PSM 0: solo orientamento e script
+            image = np.ascontiguousarray(image)
+            height, width = image.shape
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            try:
+                result = api.DetectOrientationScript()
+            finally:
+                api.Clear()
+            if not result:
+                return 0, 0.0
+            # orient_deg è l'orientamento antiorario del testo: la correzione è il suo complemento
+            return (360 - result['orient_deg']) % 360, float(result['orient_conf'])
+
+        import pytesseract
+        from PIL import Image
+
+        if self.tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
+
+        pil_image = Image.fromarray(image)
+        pil_image.format = 'PPM'
+        result = pytesseract.image_to_osd(pil_image, config='--psm 0', output_type=pytesseract.Output.DICT)
+        return result.get('rotate', 0) % 360, float(result.get('orientation_conf', 0.0))
+
+    def _tesserocr_api(self, language: str, psm: int):
+        """Istanza di PyTessBaseAPI del worker corrente (l'inizializzazione è costosa)"""
+        import tesserocr
+
+        apis: Dict[Tuple[str, int], 'tesserocr.PyTessBaseAPI'] = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+
+        api = apis.get((language, psm))
+        if api is None:
+            kwargs = {'lang': language, 'psm': psm}
+            if self.tessdata_path:
+                kwargs['path'] = self.tessdata_path
+            api = apis[(language, psm)] = tesserocr.PyTessBaseAPI(**kwargs)
+        return api
+
+    def _tesserocr_to_string(self, image: 'np.ndarray', language: str, psm: int) -> str:
+        import numpy as np
+
+        api = self._tesserocr_api(language, psm)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape
+        # Byte grezzi 8 bit/pixel: nessuna codifica in formati immagine
+        api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def _tesserocr_to_tsv(self, image: 'np.ndarray', language: str, psm: int) -> str:
+        import numpy as np
+
+        api = self._tesserocr_api(language, psm)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape
+        api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        try:
+            return api.GetTSVText(0)
+        finally:
+            api.Clear()
+
+    def _pytesseract_to_string(self, image: 'np.ndarray', language: str, psm: int) -> str:
+        import pytesseract
+        from PIL import Image
+
+        if self.tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
+
+        # fromarray condivide il buffer; PPM evita la compressione PNG di pytesseract
+        pil_image = Image.fromarray(image)
+        pil_image.format = 'PPM'
+        return pytesseract.image_to_string(pil_image, lang=language, config=f'--psm {psm}')
+
+    def _pytesseract_to_tsv(self, image: 'np.ndarray', language: str, psm: int) -> str:
+        import pytesseract
+        from PIL import Image
+
+        if self.tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
+
+        pil_image = Image.fromarray(image)
+        pil_image.format = 'PPM'
+        return pytesseract.image_to_data(pil_image, lang=language, config=f'--psm {psm}')
@@ -0,0 +1,102 @@
+from array import array
+from statistics import median
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Rapporto tra l'altezza di una riga e quella del corpo del testo oltre cui
+# la riga è considerata un titolo (livello 1 e 2)
+HEADING_HEIGHT_RATIO = (1.6, 1.25)
+HEADING_MAX_WORDS = 12
+
+# Confidenza media sotto cui una pagina è segnalata come OCR scadente
+LOW_CONFIDENCE = 60.0
+
+class PageLayout:
+    """Parole riconosciute da Tesseract in una pagina, in forma compatta
+
+    Un'unica chiamata image_to_data (TSV) fornisce testo, riquadri, id di
+    blocco/paragrafo/riga e confidenza di ogni parola. I valori numerici sono
+    tenuti in array tipizzati (~20 byte per parola) invece che in dizionari;
+    le coordinate sono quelle dell'immagine passata a Tesseract.
+    """
+
+    __slots__ = ('words', 'boxes', 'lines', 'confidences')
+
+    def __init__(self):
+        self.words: List[str] = []
+        self.boxes = array('i')        # left, top, width, height per parola
+        self.lines = array('H')        # block, paragrafo, riga per parola
+        self.confidences = array('b')  # 0-100
+
+    @classmethod
+    def from_tsv(cls, tsv: str) -> 'PageLayout':
+        """Costruisce il layout dall'output TSV di Tesseract (solo le righe di livello parola)"""
+        layout = cls()
+        for row in tsv.splitlines():
+            fields = row.split('\t')
+            # level page block par line word left top width height conf text
+            if len(fields) < 12 or fields[0] != '5':
+                continue
+            word = fields[11].strip()
+            if not word:
+                continue
+            layout.words.append(word)
+            layout.boxes.extend((int(fields[6]), int(fields[7]), int(fields[8]), int(fields[9])))
+            layout.lines.extend((int(fields[2]), int(fields[3]), int(fields[4])))
+            layout.confidences.append(max(0, min(100, round(float(fields[10])))))
+        return layout
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def iter_lines(self) -> Iterator[Tuple[Tuple[int, int, int], List[int]]]:
+        """Righe come (block, paragrafo, riga) e indici delle parole, nell'ordine di lettura"""
+        current, indices = None, []
+        for index in range(len(self.words)):
+            key = tuple(self.lines[index * 3:index * 3 + 3])
+            if key != current and indices:
+                yield current, indices
+                indices = []
+            current = key
+            indices.append(index)
+        if indices:
+            yield current, indices
+
+    def text(self) -> str:
+        """Testo della pagina: parole della riga separate da spazi, paragrafi da una riga vuota"""
+        parts = []
+        previous_paragraph = None
+        for key, indices in self.iter_lines():
+            paragraph = key[:2]
+            if parts:
+                parts.append('\n\n' if paragraph != previous_paragraph else '\n')
+            parts.append(' '.join(self.words[index] for index in indices))
+            previous_paragraph = paragraph
+        return ''.join(parts)
+
+    def mean_confidence(self) -> Optional[float]:
+        """Confidenza media delle parole pesata sulla lunghezza, None se la pagina non ha testo"""
+        total = weight = 0
+        for word, confidence in zip(self.words, self.confidences):
+            total += confidence * len(word)
+            weight += len(word)
+        return round(total / weight, 1) if weight else None
+
+    def structure_hints(self) -> List[Dict[str, Any]]:
+        """Titoli della pagina: righe brevi con caratteri più alti del corpo del testo"""
+        lines = []
+        for _, indices in self.iter_lines():
+            height = median(self.boxes[index * 4 + 3] for index in indices)
+            lines.append((indices, height))
+        if not lines:
+            return []
+
+        # Altezza del corpo: mediana delle righe pesata sul numero di parole
+        body_height = median(height for indices, height in lines for _ in indices)
+        hints = []
+        for indices, height in lines:
+            text = ' '.join(self.words[index] for index in indices)
+            ratio = height / body_height if body_height else 1.0
+            if len(indices) <= HEADING_MAX_WORDS and ratio >= HEADING_HEIGHT_RATIO[1]:
+                level = 1 if ratio >= HEADING_HEIGHT_RATIO[0] else 2
+                hints.append({'type': 'heading', 'level': level, 'text': text})
+        return hints
@@ -0,0 +1,154 @@
+import zlib
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Lato della griglia del difference hash: 16x16 = 256 bit per pagina
+HASH_SIZE = 16
+
+# Bit diversi (su 256) entro cui due pagine sono candidate a essere la stessa:
+# filtro grossolano, la conferma spetta al confronto delle maschere
+DUPLICATE_MAX_DISTANCE = 24
+
+# Candidate confrontate per pagina, dalla più vicina per hash
+MAX_CANDIDATES = 4
+
+# Maschera dell'inchiostro a ~150 dpi: la media su blocchi 2x2 attenua il
+# rumore della scansione senza cancellare i tratti sottili; inchiostro = più
+# scuro della carta di almeno MASK_CONTRAST livelli
+MASK_SCALE = 1 / 2
+MASK_CONTRAST = 40
+
+# Conferma: le maschere si allineano entro ALIGN_SHIFT pixel e si confrontano
+# a riquadri di TILE pixel (~5 mm); un riquadro è diverso se più di
+# TILE_NOISE_PIXELS pixel di inchiostro non hanno inchiostro vicino nell'altra
+# pagina. Basta un riquadro diverso (un numero di pagina, un segno) per
+# rifare l'OCR. Un numero di pagina diverso vale ~25 pixel, il rumore 0-1
+ALIGN_SHIFT = 4
+TILE = 32
+TILE_NOISE_PIXELS = 4
+
+class PageFingerprint(NamedTuple):
+    page_hash: int
+    shape: Tuple[int, int]   # Dimensioni della maschera
+    mask: bytes              # Maschera dell'inchiostro impacchettata (np.packbits) e compressa
+
+def dhash(image: 'np.ndarray', size: int = HASH_SIZE) -> int:
+    """Difference hash di una pagina in scala di grigi: un bit per ogni coppia
+    di celle adiacenti della miniatura, 1 se la cella a sinistra è più chiara"""
+    import cv2
+    import numpy as np
+
+    thumbnail = cv2.resize(image, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (thumbnail[:, :-1] > thumbnail[:, 1:]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming_distance(first: int, second: int) -> int:
+    return (first ^ second).bit_count()
+
+def ink_mask(image: 'np.ndarray') -> 'np.ndarray':
+    """Maschera dell'inchiostro (0/1) di una pagina in scala di grigi, a MASK_SCALE"""
+    import cv2
+    import numpy as np
+
+    thumbnail = cv2.resize(image, None, fx=MASK_SCALE, fy=MASK_SCALE, interpolation=cv2.INTER_AREA)
+    # Livello della carta: il valore più frequente sopra la mediana
+    histogram = np.bincount(thumbnail.ravel(), minlength=256)
+    median = int(np.searchsorted(histogram.cumsum(), thumbnail.size / 2))
+    paper = median + int(histogram[median:].argmax())
+    return (thumbnail < paper - MASK_CONTRAST).view(np.uint8)
+
+def fingerprint(image: 'np.ndarray') -> PageFingerprint:
+    """Hash e maschera dell'inchiostro di una pagina (già ritagliata sul contenuto)"""
+    import numpy as np
+
+    mask = ink_mask(image)
+    return PageFingerprint(dhash(image), mask.shape, zlib.compress(np.packbits(mask).tobytes(), 1))
+
+def _unpack(page: PageFingerprint) -> 'np.ndarray':
+    import numpy as np
+
+    bits = np.frombuffer(zlib.decompress(page.mask), np.uint8)
+    return np.unpackbits(bits, count=page.shape[0] * page.shape[1]).reshape(page.shape)
+
+def _best_shift(first: 'np.ndarray', second: 'np.ndarray') -> int:
+    """Spostamento (entro ALIGN_SHIFT) che sovrappone meglio due profili di inchiostro"""
+    import numpy as np
+
+    costs = []
+    for shift in range(-ALIGN_SHIFT, ALIGN_SHIFT + 1):
+        start = max(0, -shift)
+        length = min(len(first) - start, len(second) - start - shift)
+        costs.append((np.abs(first[start:start + length] - second[start + shift:start + shift + length]).sum(), shift))
+    return min(costs)[1]
+
+def _overlap(first: 'np.ndarray', second: 'np.ndarray', dy: int, dx: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Parti comuni delle due maschere con la seconda spostata di (dy, dx)"""
+    y0, x0 = max(0, -dy), max(0, -dx)
+    height = min(first.shape[0] - y0, second.shape[0] - y0 - dy)
+    width = min(first.shape[1] - x0, second.shape[1] - x0 - dx)
+    return (
+        first[y0:y0 + height, x0:x0 + width],
+        second[y0 + dy:y0 + dy + height, x0 + dx:x0 + dx + width],
+    )
+
+def changed_tiles(first: PageFingerprint, second: PageFingerprint) -> Optional[int]:
+    """Riquadri in cui le due pagine, allineate, hanno inchiostro diverso
+
+    La tolleranza di un pixel attorno all'inchiostro assorbe rumore e
+    piccoli spostamenti della scansione; None se le pagine hanno
+    dimensioni troppo diverse per essere la stessa.
+    """
+    import cv2
+    import numpy as np
+
+    if abs(first.shape[0] - second.shape[0]) > ALIGN_SHIFT or abs(first.shape[1] - second.shape[1]) > ALIGN_SHIFT:
+        return None
+
+    # Allineamento sui profili di righe e colonne: uno spostamento per asse
+    masks = _unpack(first), _unpack(second)
+    dy = _best_shift(*(mask.sum(axis=1, dtype=np.int32) for mask in masks))
+    dx = _best_shift(*(mask.sum(axis=0, dtype=np.int32) for mask in masks))
+    aligned = _overlap(*masks, dy, dx)
+
+    kernel = np.ones((3, 3), np.uint8)
+    near_first, near_second = (cv2.dilate(mask, kernel) for mask in aligned)
+    changed = (aligned[0] > near_second) | (aligned[1] > near_first)
+
+    # Riquadri interi: i bordi si completano con pixel vuoti, così una
+    # differenza sul margine (il numero di pagina) non sfugge
+    height, width = changed.shape
+    changed = np.pad(changed, ((0, -height % TILE), (0, -width % TILE)))
+    per_tile = changed.reshape(changed.shape[0] // TILE, TILE, changed.shape[1] // TILE, TILE).sum(axis=(1, 3))
+    return int(np.count_nonzero(per_tile > TILE_NOISE_PIXELS))
+
+class PageHashIndex:
+    """Risultati delle pagine già elaborate di un documento, indicizzati per impronta
+
+    La ricerca scorre gli hash delle pagine note (uno XOR e un popcount
+    ciascuna) e confronta le maschere dell'inchiostro solo con le candidate
+    più vicine: una pagina si riusa se nessun riquadro è cambiato.
+    """
+
+    def __init__(self, max_distance: int = DUPLICATE_MAX_DISTANCE, max_candidates: int = MAX_CANDIDATES):
+        self.max_distance = max_distance
+        self.max_candidates = max_candidates
+        self._entries: List[Tuple[PageFingerprint, Any]] = []
+
+    def find(self, page: PageFingerprint) -> Optional[Any]:
+        """Risultato della pagina già vista uguale a questa, None se la pagina è nuova"""
+        candidates = sorted(
+            (hamming_distance(page.page_hash, known.page_hash), index)
+            for index, (known, _) in enumerate(self._entries)
+        )
+        for distance, index in candidates[:self.max_candidates]:
+            if distance > self.max_distance:
+                break
+            known, result = self._entries[index]
+            if changed_tiles(page, known) == 0:
+                return result
+        return None
+
+    def add(self, page: PageFingerprint, result: Any):
+        self._entries.append((page, result))
@@ -1,31 +1,200 @@
 import asyncio
+import contextvars
+import math
+import multiprocessing
 import os
 import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Optional
-import pdfplumber
-import pdfminer
-from pdfminer.high_level import extract_text as pdfminer_extract_text
-from pdf2image import convert_from_path
-import pytesseract
-import cv2
-import numpy as np
-from PIL import Image
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple
 import logging
 
-from .models import PDFInfo
+from . import metrics
+from .cancellation import CancelToken, JobCancelledError
+from .language import MIXED_LANGUAGE, detect_language
+from .ocr_layout import LOW_CONFIDENCE
+from .models import OCRPageInfo, PDFInfo
+from .ocr_engine import OCREngine
+from .page_hash import PageHashIndex, fingerprint
+from .profiler import CURRENT_PROFILER, SamplingProfiler
+from .rasterizer import PageRasterizer
+from .text_backends import TextBackend, default_text_backend, get_text_backend
+from .tracing import JobTrace
+
+# I motori pesanti (pdfplumber, PDFium/poppler, OpenCV, Tesseract) sono importati
+# nei metodi che li usano, così l'avvio del server non li attende
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Callback di avanzamento: (pagine completate, pagine totali)
+ProgressCallback = Callable[[int, int], None]
+
+# Callback con l'esito OCR di ogni pagina (lingua usata, ...)
+PageCallback = Callable[[OCRPageInfo], None]
+
+# Scala della pagina usata per riconoscere la lingua prima dell'OCR completo
+LANGUAGE_PROBE_SCALE = 0.5
+
+
+# Miniatura (~100 dpi) su cui stimare l'orientamento: basta per l'OSD e costa
+# una frazione della pagina a 300 dpi
+ORIENTATION_THUMBNAIL_SCALE = 1 / 3
+
+# Confidenza OSD minima per ruotare una pagina (sotto si assume dritta)
+ORIENTATION_MIN_CONFIDENCE = 2.0
+
+# Passata di densità dell'inchiostro: su una miniatura (~75 dpi) si cercano i
+# pixel scuri per saltare le pagine vuote e ritagliare i margini
+INK_SCAN_SCALE = 0.25
+INK_CONTRAST = 40            # Differenza dal livello della carta oltre cui un pixel è inchiostro
+MIN_PAPER_LEVEL = 128        # Con un fondo più scuro la pagina non si ritaglia
+SPECK_PIXELS = 4             # Macchie isolate fino a quest'area (in miniatura) sono polvere
+CONTENT_PADDING = 40         # Margine lasciato attorno al contenuto (pixel a 300 dpi)
+
+# Caratteri medi per pagina oltre i quali l'anteprima usa il text layer invece dell'OCR
+PREVIEW_NATIVE_MIN_CHARS = 100
+
+# Modalità di segmentazione Tesseract (senza OSD) per tipo di documento
+DOCUMENT_TYPE_PSM = {
+    'auto': 3,           # Segmentazione automatica
+    'single_column': 4,  # Una colonna di testo di dimensioni variabili
+    'sparse_text': 11,   # Testo sparso, senza ordine di lettura
+    'slides': 11,        # Slide: blocchi di testo sparsi sulla pagina
+}
+
+# Intervalli di pagine per processo: blocchi piccoli bilanciano pagine di costo diverso
+NATIVE_CHUNKS_PER_WORKER = 4
+
+# Intervallo con cui l'event loop controlla l'annullamento mentre i processi
+# estraggono (dell'ordine di una pagina)
+NATIVE_CANCEL_POLL_SECONDS = 0.05
+
+def _extract_page_range(
+    pdf_path: str,
+    first_page: int,
+    last_page: int,
+    text_backend: str,
+    profile: bool = False,
+    cancel_event: Optional[Any] = None
+) -> Tuple[List[str], List[float], Optional[str], Tuple[float, float, Tuple[int, int, str]]]:
+    """Estrae il testo nativo di un intervallo di pagine in un processo del pool
+    
+    Ogni processo apre il file per conto proprio: tra i processi passano solo
+    percorso, numeri di pagina e testo. Restituisce testi e durate per pagina,
+    se richiesto gli stack campionati dal profiler del processo e la finestra
+    di esecuzione (inizio, fine, (pid, tid, thread)) per la timeline del job.
+    cancel_event (Event di un multiprocessing.Manager) è controllato a ogni
+    pagina: se impostato l'intervallo si interrompe e il risultato è parziale.
+    """
+    range_started = time.perf_counter()
+    profiler = None
+    if profile:
+        threading.current_thread().name = f"native-worker-{os.getpid()}"
+        profiler = SamplingProfiler()
+        profiler.start()
+        profiler.attach_thread()
+    
+    texts, durations = [], []
+    try:
+        pages = get_text_backend(text_backend).iter_pages(pdf_path, first_page, last_page)
+        while cancel_event is None or not cancel_event.is_set():
+            started = time.perf_counter()
+            page_text = next(pages, None)
+            if page_text is None:
+                break
+            texts.append(page_text)
+            durations.append(time.perf_counter() - started)
+    finally:
+        if profiler:
+            profiler.detach_thread()
+            profiler.stop()
+    
+    thread = threading.current_thread()
+    timing = (range_started, time.perf_counter(), (os.getpid(), thread.ident, thread.name))
+    return texts, durations, profiler.collapsed() if profiler else None, timing
+
 class PDFProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        rasterizer_backend: Optional[str] = None,
+        text_backend: Optional[str] = None
+    ):
         # Configura Tesseract per usare i binari bundled
         self.tesseract_path = self._get_tesseract_path()
-        if self.tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
+        self.ocr_engine = OCREngine(self.tesseract_path)
         
         # Configura Poppler per pdf2image
         self.poppler_path = self._get_poppler_path()
+        
+        # Rendering delle pagine nel processo (PDFium), con Poppler come fallback
+        self.rasterizer = PageRasterizer(self.poppler_path, rasterizer_backend)
+        
+        # Motore per il testo nativo: PDFium (compilato) se disponibile, altrimenti pdfplumber
+        self.text_backend = text_backend or default_text_backend()
+        
+        # Buffer di lavoro per worker riusati tra le pagine dal preprocessing
+        self._scratch = threading.local()
+        
+        # Pool di processi per l'estrazione nativa (pdfminer è Python puro e
+        # non scala sui thread), creato al primo documento che lo richiede
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Manager per gli eventi di annullamento condivisi con il pool di processi
+        self._process_manager: Optional[Any] = None
+        
+        # Pool di worker per il lavoro CPU-bound (rendering, preprocessing, OCR),
+        # così l'event loop resta libero di servire stato ed eventi
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pdf-worker')
+        metrics.WORKER_POOL_SIZE.set(self.max_workers)
+    
+    async def _run_in_worker(self, func: Callable, *args):
+        """Esegue una funzione bloccante nel pool, misurandone l'utilizzo"""
+        loop = asyncio.get_running_loop()
+        # Il contesto viene copiato nel worker, così il profiler del job lo segue
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, context.run, self._instrumented_call, func, args)
+    
+    def _instrumented_call(self, func: Callable, args: tuple):
+        metrics.WORKER_POOL_BUSY.inc()
+        profiler = CURRENT_PROFILER.get()
+        started = time.perf_counter()
+        try:
+            with profiler.attached() if profiler else nullcontext():
+                return func(*args)
+        finally:
+            metrics.WORKER_POOL_BUSY_SECONDS.inc(time.perf_counter() - started)
+            metrics.WORKER_POOL_BUSY.dec()
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # spawn: il server è multi-thread e fork ne copierebbe lo stato dei lock
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._process_pool
+    
+    def _new_cancel_event(self) -> Any:
+        """Evento di annullamento condivisibile con i processi del pool (operazione bloccante)"""
+        if self._process_manager is None:
+            self._process_manager = multiprocessing.get_context('spawn').Manager()
+        return self._process_manager.Event()
+    
+    def shutdown(self):
+        """Chiude i pool di thread e di processi"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._process_manager is not None:
+            self._process_manager.shutdown()
+            self._process_manager = None
     
     def _get_tesseract_path(self) -> Optional[str]:
         """Trova il percorso di Tesseract bundled"""
@@ -49,16 +218,24 @@ class PDFProcessor:
         
         return None
     
+    async def page_count(self, pdf_path: str) -> int:
+        return await self._run_in_worker(self.rasterizer.page_count, pdf_path)
+    
     async def analyze_pdf(self, pdf_path: str) -> PDFInfo:
         """Analizza un PDF per determinare se è nativo o scannerizzato"""
+        return await self._run_in_worker(self._analyze_pdf_sync, pdf_path)
+    
+    def _analyze_pdf_sync(self, pdf_path: str) -> PDFInfo:
+        """Implementazione bloccante di analyze_pdf, eseguita nel pool di worker"""
         try:
             # Conta le pagine
-            with pdfplumber.open(pdf_path) as pdf:
-                page_count = len(pdf.pages)
+            page_count = self.rasterizer.page_count(pdf_path)
             
             # Prova ad estrarre testo nativo
             try:
-                native_text = pdfminer_extract_text(pdf_path)
+                native_text = '\n\n'.join(
+                    get_text_backend(self.text_backend).iter_pages(pdf_path, 1, page_count)
+                )
                 has_text = len(native_text.strip()) > 0
                 
                 # Se c'è poco testo, probabilmente è scannerizzato
@@ -76,16 +253,11 @@ class PDFProcessor:
             if not is_native:
                 # Converti una pagina in immagine per analizzare la qualità
                 try:
-                    images = convert_from_path(
-                        pdf_path, 
-                        first_page=1, 
-                        last_page=1,
-                        poppler_path=self.poppler_path
-                    )
-                    if images:
-                        img = np.array(images[0])
+                    import cv2
+                    
+                    gray = self.rasterizer.render_page(pdf_path, 1, dpi=200, grayscale=True)
+                    if gray is not None:
                         # Analisi semplificata della qualità
-                        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
                         blur = cv2.Laplacian(gray, cv2.CV_64F).var()
                         
                         if blur > 1000:
@@ -109,110 +281,603 @@ class PDFProcessor:
             logger.error(f"Errore nell'analisi del PDF: {e}")
             raise
     
-    async def extract_text_native(self, pdf_path: str) -> str:
-        """Estrae testo da PDF nativo"""
+    async def extract_text_native(
+        self,
+        pdf_path: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancelToken] = None,
+        trace: Optional[JobTrace] = None,
+        text_backend: Optional[str] = None
+    ) -> str:
+        """Estrae testo da PDF nativo
+        
+        text_backend sceglie il motore ('pdfium', 'pdfplumber'); di default
+        quello configurato per il processore.
+        """
+        from pdfminer.high_level import extract_text as pdfminer_extract_text
+        
         try:
-            # Prova prima con pdfplumber (migliore per layout complessi)
-            text_parts = []
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
+            backend = get_text_backend(text_backend or self.text_backend)
+            total_pages = await self._run_in_worker(self.rasterizer.page_count, pdf_path)
+            
+            page_texts = None
+            if total_pages >= backend.parallel_min_pages and self.max_workers > 1:
+                try:
+                    page_texts = await self._extract_native_parallel(
+                        pdf_path, total_pages, backend, progress_callback, cancel_token, trace
+                    )
+                except JobCancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Estrazione parallela non riuscita, uso quella sequenziale: {e}")
+                    # Il pool viene ricreato alla prossima estrazione: i processi
+                    # di quello attuale vanno chiusi, non solo dimenticati
+                    if self._process_pool is not None:
+                        self._process_pool.shutdown(wait=False, cancel_futures=True)
+                        self._process_pool = None
+            
+            if page_texts is None:
+                page_texts = await self._extract_native_serial(
+                    pdf_path, total_pages, backend, progress_callback, cancel_token, trace
+                )
             
+            text_parts = [page_text for page_text in page_texts if page_text]
             if text_parts:
                 return '\n\n'.join(text_parts)
             
             # Fallback a pdfminer
-            return pdfminer_extract_text(pdf_path)
+            return await self._run_in_worker(pdfminer_extract_text, pdf_path)
             
+        except JobCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Errore nell'estrazione testo nativo: {e}")
             raise
     
+    async def _extract_native_serial(
+        self,
+        pdf_path: str,
+        total_pages: int,
+        backend: TextBackend,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancelToken] = None,
+        trace: Optional[JobTrace] = None
+    ) -> List[str]:
+        """Testo per pagina estratto una pagina alla volta nel pool di thread"""
+        page_texts = []
+        pages = backend.iter_pages(pdf_path, 1, total_pages)
+        try:
+            for page_number in range(1, total_pages + 1):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                
+                page_texts.append(await self._run_in_worker(self._next_page_text, pages, page_number, trace))
+                metrics.PAGES_PROCESSED.inc(1, 'native')
+                
+                if progress_callback:
+                    progress_callback(page_number, total_pages)
+        finally:
+            # Chiude il documento aperto dal backend
+            pages.close()
+        
+        return page_texts
+    
+    async def _extract_native_parallel(
+        self,
+        pdf_path: str,
+        total_pages: int,
+        backend: TextBackend,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancelToken] = None,
+        trace: Optional[JobTrace] = None
+    ) -> List[str]:
+        """Testo per pagina estratto da intervalli di pagine in parallelo su più processi
+        
+        I risultati sono riassemblati nell'ordine delle pagine; l'avanzamento è
+        riportato al completamento di ogni intervallo. L'annullamento è
+        controllato ogni NATIVE_CANCEL_POLL_SECONDS e propagato ai processi,
+        che si fermano alla pagina successiva.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_process_pool()
+        profiler = CURRENT_PROFILER.get()
+        cancel_event = await asyncio.to_thread(self._new_cancel_event) if cancel_token else None
+        
+        chunk_size = max(1, math.ceil(total_pages / (self.max_workers * NATIVE_CHUNKS_PER_WORKER)))
+        ranges = [
+            (first_page, min(first_page + chunk_size - 1, total_pages))
+            for first_page in range(1, total_pages + 1, chunk_size)
+        ]
+        
+        pending = {}
+        for index, (first_page, last_page) in enumerate(ranges):
+            future = loop.run_in_executor(
+                pool, _extract_page_range, pdf_path, first_page, last_page, backend.name,
+                profiler is not None, cancel_event
+            )
+            pending[future] = (index, first_page, last_page)
+        
+        chunks: List[List[str]] = [[] for _ in ranges]
+        pages_done = 0
+        try:
+            while pending:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                done, _ = await asyncio.wait(
+                    pending, timeout=NATIVE_CANCEL_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    index, first_page, last_page = pending.pop(future)
+                    texts, durations, collapsed_stacks, (started, ended, worker) = future.result()
+                    chunks[index] = texts
+                    
+                    for duration in durations:
+                        metrics.PAGE_STEP_DURATION.observe(duration, 'native_text')
+                    metrics.PAGES_PROCESSED.inc(len(texts), 'native')
+                    if trace:
+                        trace.add_span(
+                            'native_text_range', 'page', started, ended, worker=worker,
+                            first_page=first_page, last_page=last_page
+                        )
+                    if profiler and collapsed_stacks:
+                        profiler.add_collapsed(collapsed_stacks)
+                    
+                    pages_done += len(texts)
+                    if progress_callback:
+                        progress_callback(pages_done, total_pages)
+            
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+        finally:
+            # Annullamento o errore: gli intervalli non ancora avviati non
+            # partono, quelli in corso si fermano alla pagina successiva
+            for future in pending:
+                future.cancel()
+            if cancel_event is not None and pending:
+                cancel_event.set()
+        
+        return [page_text for chunk in chunks for page_text in chunk]
+    
     async def extract_text_ocr(
         self, 
         pdf_path: str, 
         language: str = 'ita+eng',
         enable_deskew: bool = True,
-        enable_denoise: bool = True
+        enable_denoise: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_token: Optional[CancelToken] = None,
+        trace: Optional[JobTrace] = None,
+        page_callback: Optional[PageCallback] = None,
+        detect_orientation: bool = True,
+        document_type: str = 'auto',
+        crop_to_content: bool = True,
+        detect_duplicates: bool = True
     ) -> str:
-        """Estrae testo da PDF scannerizzato usando OCR"""
+        """Estrae testo da PDF scannerizzato usando OCR
+        
+        Con language='auto' il modello è scelto per pagina: dal text layer se
+        presente, altrimenti si parte dalla lingua della pagina precedente e
+        si ripete l'OCR solo se il testo riconosciuto è in un'altra lingua
+        (la prima pagina usa un OCR veloce su una versione ridotta).
+        L'orientamento è stimato su una miniatura e l'OCR usa la segmentazione
+        del tipo di documento, senza ripetere l'OSD sulla pagina intera.
+        Con crop_to_content le pagine vuote sono saltate e le altre ritagliate
+        attorno al contenuto prima del preprocessing. Con detect_duplicates le
+        pagine uguali a una pagina già letta (stesso hash percettivo e nessun
+        riquadro diverso, a meno del rumore della scansione) ne riusano il
+        testo senza nuovo OCR.
+        """
+        psm = DOCUMENT_TYPE_PSM[document_type]
+        
         try:
-            # Converti PDF in immagini
-            images = convert_from_path(
-                pdf_path,
-                poppler_path=self.poppler_path,
-                dpi=300  # DPI ottimale per OCR
-            )
+            total_pages = await self._run_in_worker(self.rasterizer.page_count, pdf_path)
             
             text_parts = []
+            blank_pages = 0
+            duplicate_pages = 0
+            pixels_total = 0
+            pixels_processed = 0
             
-            for i, image in enumerate(images):
-                # Preprocessa l'immagine
-                processed_image = await self._preprocess_image(
-                    image, 
-                    enable_deskew=enable_deskew,
-                    enable_denoise=enable_denoise
-                )
+            page_index = PageHashIndex() if detect_duplicates else None
+            
+            # Modalità automatica: lingua dell'ultima pagina letta, da verificare
+            # sulla pagina successiva
+            language_hint = None
+            
+            # Le pagine vengono renderizzate una alla volta: la memoria resta
+            # limitata a una pagina e l'avanzamento è riportato per pagina
+            for page_number in range(1, total_pages + 1):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
                 
-                # OCR
-                page_text = pytesseract.image_to_string(
-                    processed_image,
-                    lang=language,
-                    config='--psm 1'  # Automatic page segmentation with OSD
+                page_text, page_info = await self._run_in_worker(
+                    self._ocr_page,
+                    pdf_path,
+                    page_number,
+                    language,
+                    enable_deskew,
+                    enable_denoise,
+                    cancel_token,
+                    trace,
+                    detect_orientation,
+                    psm,
+                    crop_to_content,
+                    page_index,
+                    language_hint
                 )
+                if page_info.language and page_info.language_source != 'fallback':
+                    language_hint = page_info.language
+                metrics.PAGES_PROCESSED.inc(1, 'ocr')
+                blank_pages += page_info.blank
+                pixels_total += page_info.pixels_total
+                pixels_processed += page_info.pixels_processed
+                if page_info.duplicate_of:
+                    duplicate_pages += 1
+                    metrics.OCR_DUPLICATE_PAGES.inc()
+                    logger.info(f"Pagina {page_number} uguale alla pagina {page_info.duplicate_of}: testo riusato")
+                elif page_info.blank:
+                    metrics.OCR_BLANK_PAGES.inc()
+                elif page_info.language:
+                    metrics.OCR_PAGE_LANGUAGE.inc(1, page_info.language, page_info.language_source)
+                if page_info.confidence is not None and not page_info.duplicate_of:
+                    metrics.OCR_PAGE_CONFIDENCE.observe(page_info.confidence)
+                    if page_info.confidence < LOW_CONFIDENCE:
+                        logger.warning(f"Pagina {page_number}: OCR poco affidabile (confidenza {page_info.confidence})")
+                if page_callback:
+                    page_callback(page_info)
                 
                 if page_text.strip():
                     text_parts.append(page_text.strip())
                 
-                logger.info(f"Elaborata pagina {i+1}/{len(images)}")
+                logger.info(f"Elaborata pagina {page_number}/{total_pages}")
+                if progress_callback:
+                    progress_callback(page_number, total_pages)
+            
+            metrics.OCR_PIXELS.inc(pixels_processed, 'processed')
+            metrics.OCR_PIXELS.inc(pixels_total - pixels_processed, 'skipped')
+            if pixels_total:
+                logger.info(
+                    f"OCR: {blank_pages}/{total_pages} pagine vuote saltate, "
+                    f"{duplicate_pages} pagine duplicate riusate, "
+                    f"{(pixels_total - pixels_processed) / pixels_total:.0%} dei pixel esclusi"
+                )
             
             return '\n\n'.join(text_parts)
             
+        except JobCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Errore nell'OCR: {e}")
             raise
     
-    async def _preprocess_image(
+    async def extract_page_range(
+        self,
+        pdf_path: str,
+        first_page: int,
+        last_page: int,
+        language: str = 'auto'
+    ) -> Tuple[str, bool]:
+        """Testo di un intervallo di pagine (anteprima) e se è stato estratto via OCR
+        
+        Il text layer delle sole pagine richieste decide il metodo: nessuna
+        analisi del documento intero e nessun rendering per i PDF nativi.
+        """
+        backend = get_text_backend(self.text_backend)
+        page_texts = await self._run_in_worker(backend.extract_pages, pdf_path, first_page, last_page)
+        native_text = '\n\n'.join(page_text for page_text in page_texts if page_text)
+        if len(native_text.strip()) >= PREVIEW_NATIVE_MIN_CHARS * (last_page - first_page + 1):
+            return native_text, False
+        
+        text_parts = []
+        for page_number in range(first_page, last_page + 1):
+            page_text, _ = await self._run_in_worker(
+                self._ocr_page, pdf_path, page_number, language, True, True
+            )
+            if page_text.strip():
+                text_parts.append(page_text.strip())
+        return '\n\n'.join(text_parts), True
+    
+    @contextmanager
+    def _page_step(self, step: str, page_number: int, trace: Optional[JobTrace]) -> Iterator[None]:
+        """Misura un passo di una pagina sia nelle metriche sia nella timeline del job"""
+        span = trace.span(step, 'page', page=page_number) if trace else nullcontext()
+        with metrics.PAGE_STEP_DURATION.time(step), span:
+            yield
+    
+    def _next_page_text(self, pages: Iterator[str], page_number: int, trace: Optional[JobTrace] = None) -> str:
+        """Estrae il testo nativo della pagina successiva del backend"""
+        with self._page_step('native_text', page_number, trace):
+            return next(pages)
+    
+    def _ocr_page(
+        self,
+        pdf_path: str,
+        page_number: int,
+        language: str,
+        enable_deskew: bool,
+        enable_denoise: bool,
+        cancel_token: Optional[CancelToken] = None,
+        trace: Optional[JobTrace] = None,
+        detect_orientation: bool = True,
+        psm: int = 3,
+        crop_to_content: bool = True,
+        page_index: Optional[PageHashIndex] = None,
+        language_hint: Optional[str] = None
+    ) -> Tuple[str, OCRPageInfo]:
+        """Renderizza, preprocessa ed esegue l'OCR di una singola pagina
+        
+        Con page_index la pagina è confrontata con quelle già lette del
+        documento e, se è una copia, ne riusa testo e layout. Con
+        language='auto' la lingua è scelta per la pagina; language_hint
+        (lingua della pagina precedente) evita la stima preliminare e viene
+        verificata sul testo riconosciuto.
+        """
+        # Il worker controlla l'annullamento tra una fase e l'altra della pagina
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        
+        # Rendering direttamente in scala di grigi 8 bit: nessuna conversione da RGB
+        with self._page_step('rasterize', page_number, trace):
+            image = self.rasterizer.render_page(pdf_path, page_number, dpi=300, grayscale=True)  # DPI ottimale per OCR
+        if image is None:
+            return '', OCRPageInfo(page_number=page_number, language=None, language_source='skipped')
+        
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        
+        # Densità dell'inchiostro: le pagine vuote finiscono qui, le altre
+        # proseguono ritagliate attorno al contenuto (vista, nessuna copia)
+        pixels_total = image.size
+        if crop_to_content:
+            with self._page_step('content_bounds', page_number, trace):
+                bounds = self._content_bounds(image)
+            if bounds is None:
+                return '', OCRPageInfo(
+                    page_number=page_number,
+                    language=None,
+                    language_source='skipped',
+                    blank=True,
+                    pixels_total=pixels_total,
+                    pixels_processed=0
+                )
+            x0, y0, x1, y1 = bounds
+            image = image[y0:y1, x0:x1]
+        
+        # Impronta del contenuto, prima dei filtri che modificano il buffer
+        page_fingerprint = None
+        if page_index is not None:
+            with self._page_step('page_hash', page_number, trace):
+                page_fingerprint = fingerprint(image)
+                original = page_index.find(page_fingerprint)
+            if original is not None:
+                text, original_info = original
+                page_info = original_info.model_copy(update={
+                    'page_number': page_number,
+                    'duplicate_of': original_info.page_number,
+                    'pixels_total': pixels_total,
+                    'pixels_processed': 0
+                })
+                page_info.set_layout(original_info.layout)
+                return text, page_info
+        
+        # Orientamento stimato sulla miniatura; si ruota solo se necessario
+        rotation = 0
+        if detect_orientation:
+            with self._page_step('orientation', page_number, trace):
+                image, rotation = self._fix_orientation(image, page_number)
+        
+        # Preprocessa l'immagine
+        with self._page_step('preprocess', page_number, trace):
+            processed_image = self._preprocess_image(
+                image,
+                enable_deskew=enable_deskew,
+                enable_denoise=enable_denoise,
+                page_number=page_number,
+                trace=trace
+            )
+        
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        
+        # Lingua della pagina (solo in modalità automatica)
+        language_source = 'fixed'
+        if language == 'auto':
+            with self._page_step('language', page_number, trace):
+                language, language_source = self._detect_page_language(
+                    pdf_path, page_number, processed_image, language_hint
+                )
+        
+        # OCR sul buffer binarizzato, senza OSD (orientamento già corretto):
+        # una sola passata fornisce testo, layout e confidenze
+        with self._page_step('ocr', page_number, trace):
+            layout = self.ocr_engine.image_to_layout(processed_image, language, psm=psm)
+        
+        # Lingua ereditata dalla pagina precedente: se il testo riconosciuto è
+        # in un'altra lingua (o le mescola) la pagina si rilegge con quel modello
+        if language_source == 'previous':
+            detected = detect_language(layout.text())
+            if detected and detected != language:
+                logger.info(f"Pagina {page_number}: lingua {detected} invece di {language}, nuovo OCR")
+                language, language_source = detected, 'recognized'
+                with self._page_step('ocr', page_number, trace):
+                    layout = self.ocr_engine.image_to_layout(processed_image, language, psm=psm)
+        page_info = OCRPageInfo(
+            page_number=page_number,
+            language=language,
+            language_source=language_source,
+            rotation=rotation,
+            pixels_total=pixels_total,
+            pixels_processed=image.size,
+            confidence=layout.mean_confidence(),
+            word_count=len(layout)
+        )
+        page_info.set_layout(layout)
+        text = layout.text()
+        if page_index is not None:
+            page_index.add(page_fingerprint, (text, page_info))
+        return text, page_info
+    
+    def _content_bounds(self, image: 'np.ndarray') -> Optional[Tuple[int, int, int, int]]:
+        """Riquadro (x0, y0, x1, y1) del contenuto con margine, None se la pagina è vuota
+        
+        Nel dubbio (fondo scuro o non uniforme) restituisce la pagina intera:
+        una pagina è vuota solo se non ha altro che polvere.
+        """
+        import cv2
+        import numpy as np
+        
+        height, width = image.shape[:2]
+        block = round(1 / INK_SCAN_SCALE)
+        # Miniatura col minimo di ogni blocco: i tratti sottili o chiari restano
+        # scuri quanto a piena risoluzione
+        thumbnail = cv2.erode(image, np.ones((block, block), np.uint8))[::block, ::block]
+        
+        # Soglia relativa al livello della carta: il valore più frequente tra
+        # quelli sopra la mediana, così l'inchiostro saturo a 0 non conta
+        histogram = np.bincount(thumbnail.ravel(), minlength=256)
+        median = int(np.searchsorted(histogram.cumsum(), thumbnail.size / 2))
+        paper = median + int(histogram[median:].argmax())
+        if paper < MIN_PAPER_LEVEL:
+            return 0, 0, width, height
+        ink = (thumbnail < paper - INK_CONTRAST).view(np.uint8)
+        
+        # Le macchie isolate (polvere, rumore della scansione) non contano
+        _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        stats = stats[1:][stats[1:, cv2.CC_STAT_AREA] > SPECK_PIXELS]
+        if not len(stats):
+            return None
+        
+        left = stats[:, cv2.CC_STAT_LEFT]
+        top = stats[:, cv2.CC_STAT_TOP]
+        # Ogni pixel della miniatura copre i pixel da -block/2 a +block/2 dal
+        # suo centro (ancora dell'erosione al centro del blocco)
+        return (
+            max(0, int(left.min() - 1) * block - CONTENT_PADDING),
+            max(0, int(top.min() - 1) * block - CONTENT_PADDING),
+            min(width, int((left + stats[:, cv2.CC_STAT_WIDTH]).max() + 1) * block + CONTENT_PADDING),
+            min(height, int((top + stats[:, cv2.CC_STAT_HEIGHT]).max() + 1) * block + CONTENT_PADDING),
+        )
+    
+    def _fix_orientation(self, image: 'np.ndarray', page_number: int) -> Tuple['np.ndarray', int]:
+        """Raddrizza la pagina se l'OSD sulla miniatura la rileva ruotata"""
+        import cv2
+        
+        try:
+            thumbnail = cv2.resize(
+                image, None,
+                fx=ORIENTATION_THUMBNAIL_SCALE,
+                fy=ORIENTATION_THUMBNAIL_SCALE,
+                interpolation=cv2.INTER_AREA
+            )
+            rotation, confidence = self.ocr_engine.detect_orientation(thumbnail)
+        except Exception as e:
+            # Pagine quasi vuote o modello osd mancante: la pagina resta com'è
+            logger.debug(f"Orientamento non rilevato per la pagina {page_number}: {e}")
+            return image, 0
+        
+        if rotation == 0 or confidence < ORIENTATION_MIN_CONFIDENCE:
+            return image, 0
+        
+        rotate_codes = {
+            90: cv2.ROTATE_90_CLOCKWISE,
+            180: cv2.ROTATE_180,
+            270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+        }
+        logger.info(f"Pagina {page_number} ruotata di {rotation}° (confidenza {confidence:.1f})")
+        return cv2.rotate(image, rotate_codes[rotation]), rotation
+    
+    def _detect_page_language(
+        self,
+        pdf_path: str,
+        page_number: int,
+        image: 'np.ndarray',
+        language_hint: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Sceglie il modello OCR della pagina: (lingua, origine della stima)
+        
+        Il text layer, se presente, costa solo una lettura. Altrimenti si usa
+        la lingua della pagina precedente (verificata dopo l'OCR) oppure, sulla
+        prima pagina, un OCR con il modello combinato su metà risoluzione.
+        Nel dubbio si usa il modello combinato.
+        """
+        import cv2
+        
+        native_text = get_text_backend(self.text_backend).extract_pages(pdf_path, page_number, page_number)[0]
+        language = detect_language(native_text)
+        if language:
+            return language, 'native'
+        if language_hint:
+            return language_hint, 'previous'
+        
+        try:
+            probe = cv2.resize(image, None, fx=LANGUAGE_PROBE_SCALE, fy=LANGUAGE_PROBE_SCALE, interpolation=cv2.INTER_AREA)
+            language = detect_language(self.ocr_engine.image_to_string(probe, MIXED_LANGUAGE, psm=3))
+            if language:
+                return language, 'probe'
+        except Exception as e:
+            logger.warning(f"Rilevamento lingua non riuscito per la pagina {page_number}: {e}")
+        
+        return MIXED_LANGUAGE, 'fallback'
+    
+    def _scratch_buffer(self, shape: tuple) -> 'np.ndarray':
+        """Buffer di lavoro del worker corrente, riallocato solo se cambia il formato pagina"""
+        import numpy as np
+        
+        buffer = getattr(self._scratch, 'buffer', None)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._scratch.buffer = np.empty(shape, dtype=np.uint8)
+        return buffer
+    
+    def _preprocess_image(
         self, 
-        image: Image.Image, 
+        image: 'np.ndarray', 
         enable_deskew: bool = True,
-        enable_denoise: bool = True
-    ) -> Image.Image:
-        """Preprocessa un'immagine per migliorare l'OCR"""
-        # Converti PIL a OpenCV
-        img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        enable_denoise: bool = True,
+        page_number: int = 0,
+        trace: Optional[JobTrace] = None
+    ) -> 'np.ndarray':
+        """Preprocessa una pagina in scala di grigi per migliorare l'OCR
+        
+        I filtri scrivono sul buffer della pagina o sul buffer di lavoro del
+        worker: il risultato resta valido fino alla pagina successiva.
+        """
+        import cv2
         
-        # Converti in scala di grigi
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        scratch = self._scratch_buffer(gray.shape)
         
-        # Denoise
+        # Denoise (i due filtri si alternano tra buffer di pagina e di lavoro)
         if enable_denoise:
-            gray = cv2.medianBlur(gray, 3)
-            gray = cv2.bilateralFilter(gray, 9, 75, 75)
+            with self._page_step('denoise', page_number, trace):
+                cv2.medianBlur(gray, 3, dst=scratch)
+                cv2.bilateralFilter(scratch, 9, 75, 75, dst=gray)
         
         # Deskew (raddrizzamento)
         if enable_deskew:
-            gray = self._deskew_image(gray)
+            with self._page_step('deskew', page_number, trace):
+                gray = self._deskew_image(gray, out=scratch)
         
         # Migliora il contrasto
-        gray = cv2.equalizeHist(gray)
+        cv2.equalizeHist(gray, dst=gray)
         
         # Binarizzazione
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gray)
         
-        # Converti di nuovo in PIL
-        return Image.fromarray(binary)
+        return gray
     
-    def _deskew_image(self, image: np.ndarray) -> np.ndarray:
-        """Raddrizza un'immagine ruotata"""
+    def _deskew_image(self, image: 'np.ndarray', out: Optional['np.ndarray'] = None) -> 'np.ndarray':
+        """Raddrizza un'immagine ruotata (in `out`, se fornito)"""
+        import cv2
+        import numpy as np
+        
         try:
-            # Trova i contorni
-            coords = np.column_stack(np.where(image > 0))
+            # Trova i contorni: coordinate (riga, colonna) in int32, senza
+            # maschere e indici int64 intermedi
+            points = cv2.findNonZero(image)
             
-            if len(coords) == 0:
+            if points is None:
                 return image
+            coords = np.ascontiguousarray(points[:, 0, ::-1])
             
             # Calcola l'angolo di rotazione
             angle = cv2.minAreaRect(coords)[-1]
@@ -226,7 +891,7 @@ class PDFProcessor:
                 (h, w) = image.shape[:2]
                 center = (w // 2, h // 2)
                 M = cv2.getRotationMatrix2D(center, angle, 1.0)
-                image = cv2.warpAffine(image, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+                image = cv2.warpAffine(image, M, (w, h), dst=out, flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
             
             return image
             
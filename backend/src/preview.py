@@ -0,0 +1,81 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from . import metrics
+from .export_manager import ExportManager
+from .models import DSAProfile
+from .pdf_processor import PDFProcessor
+from .structure_reconstructor import StructureReconstructor
+from .text_normalizer import TextNormalizer
+
+logger = logging.getLogger(__name__)
+
+# Pagine elaborate di default per l'anteprima
+PREVIEW_PAGES = 2
+
+# Pagine massime di un'anteprima: oltre si elabora il documento con un job
+PREVIEW_MAX_PAGES = 10
+
+# Anteprime (contenuto strutturato, indipendente dal profilo) tenute in cache
+PREVIEW_CACHE_SIZE = 32
+
+PreviewKey = Tuple[str, int, int, int, int, str]
+
+class PreviewService:
+    """Anteprima HTML delle prime pagine di un PDF con un profilo DSA
+
+    Estrazione, normalizzazione e struttura delle pagine richieste sono
+    tenute in una cache LRU indicizzata per file (percorso, dimensione e data
+    di modifica) e intervallo di pagine: cambiando profilo si rigenera solo
+    l'HTML.
+    """
+
+    def __init__(
+        self,
+        pdf_processor: PDFProcessor,
+        text_normalizer: TextNormalizer,
+        structure_reconstructor: StructureReconstructor,
+        export_manager: ExportManager,
+        cache_size: int = PREVIEW_CACHE_SIZE
+    ):
+        self.pdf_processor = pdf_processor
+        self.text_normalizer = text_normalizer
+        self.structure_reconstructor = structure_reconstructor
+        self.export_manager = export_manager
+        self.cache_size = cache_size
+        self._cache: OrderedDict[PreviewKey, Dict[str, Any]] = OrderedDict()
+
+    async def render(
+        self,
+        pdf_path: str,
+        dsa_profile: DSAProfile,
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+        language: str = 'auto'
+    ) -> str:
+        """HTML delle pagine da first_page a last_page (default: le prime PREVIEW_PAGES)"""
+        page_count = await self.pdf_processor.page_count(pdf_path)
+        if not 1 <= first_page <= page_count:
+            raise ValueError(f"Pagina {first_page} fuori dal documento ({page_count} pagine)")
+        last_page = min(page_count, last_page or first_page + PREVIEW_PAGES - 1, first_page + PREVIEW_MAX_PAGES - 1)
+
+        stat = os.stat(pdf_path)
+        key = (os.path.realpath(pdf_path), stat.st_size, stat.st_mtime_ns, first_page, last_page, language)
+        structured_content = self._cache.get(key)
+        metrics.record_cache_access('preview', structured_content is not None)
+        if structured_content is None:
+            structured_content = await self._build(pdf_path, first_page, last_page, language)
+            self._cache[key] = structured_content
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(key)
+
+        return self.export_manager.render_html(structured_content, dsa_profile)
+
+    async def _build(self, pdf_path: str, first_page: int, last_page: int, language: str) -> Dict[str, Any]:
+        text, used_ocr = await self.pdf_processor.extract_page_range(pdf_path, first_page, last_page, language)
+        logger.info(f"Anteprima pagine {first_page}-{last_page} ({'OCR' if used_ocr else 'testo nativo'})")
+        normalized_text = await self.text_normalizer.normalize_text(text)
+        return await self.structure_reconstructor.reconstruct_structure(normalized_text)
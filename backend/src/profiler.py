@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Profiler del job in esecuzione nel contesto corrente (propagato ai worker del pool)
+CURRENT_PROFILER: ContextVar[Optional['SamplingProfiler']] = ContextVar('current_profiler', default=None)
+
+# Moduli il cui frame in cima allo stack indica un thread inattivo (event loop in attesa)
+IDLE_MODULES = ('selectors.py',)
+
+class SamplingProfiler:
+    """Profiler a campionamento a basso overhead, limitato ai thread di un job
+
+    Un thread di servizio legge periodicamente gli stack (sys._current_frames)
+    dei soli thread registrati per il job e li accumula in formato "collapsed
+    stacks", pronto per flamegraph.pl, speedscope o inferno. Il tempo passato
+    in Tesseract/Poppler (processi esterni) appare come attesa sul subprocess.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self._stacks: Counter = Counter()
+        self._threads: Dict[int, list] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        if self.started_at is not None:
+            self.duration = time.perf_counter() - self.started_at
+
+    def attach_thread(self):
+        """Include il thread corrente nel campionamento (rientrante)"""
+        thread = threading.current_thread()
+        with self._lock:
+            entry = self._threads.setdefault(thread.ident, [thread.name, 0])
+            entry[1] += 1
+
+    def detach_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            entry = self._threads.get(ident)
+            if entry:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._threads[ident]
+
+    @contextmanager
+    def attached(self) -> Iterator[None]:
+        self.attach_thread()
+        try:
+            yield
+        finally:
+            self.detach_thread()
+
+    def add_collapsed(self, collapsed: str):
+        """Unisce stack già aggregati (es. campionati in un processo worker)"""
+        with self._lock:
+            for line in collapsed.splitlines():
+                stack, _, count = line.rpartition(' ')
+                if stack and count.isdigit():
+                    self._stacks[stack] += int(count)
+
+    def collapsed(self) -> str:
+        """Stack aggregati, una riga "frame;frame;frame conteggio" per stack"""
+        with self._lock:
+            items = sorted(self._stacks.items(), key=lambda item: item[1], reverse=True)
+        return '\n'.join(f"{stack} {count}" for stack, count in items)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            threads = [(ident, entry[0]) for ident, entry in self._threads.items()]
+
+        stacks = []
+        for ident, thread_name in threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            if os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(thread_name)
+            stacks.append(';'.join(reversed(stack)))
+
+        with self._lock:
+            self.samples += 1
+            for stack in stacks:
+                self._stacks[stack] += 1
@@ -0,0 +1,111 @@
+import functools
+import importlib.util
+import threading
+from typing import TYPE_CHECKING, Optional
+import logging
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RASTERIZER_BACKENDS = ('pdfium', 'poppler')
+
+# PDFium non è thread-safe: le chiamate dei worker vengono serializzate
+PDFIUM_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def pdfium_available() -> bool:
+    """Vero se pypdfium2 è installato, senza importarlo (lo si importa al primo uso)"""
+    return importlib.util.find_spec('pypdfium2') is not None
+
+class PageRasterizer:
+    """Renderizza singole pagine PDF in array NumPy (RGB o scala di grigi 8 bit)
+
+    Il backend 'pdfium' lavora nel processo, senza file temporanei né
+    sottoprocessi; 'poppler' (pdftoppm via pdf2image) resta come fallback
+    se pypdfium2 non è installato o non riesce a renderizzare una pagina.
+    """
+
+    def __init__(self, poppler_path: Optional[str] = None, backend: Optional[str] = None):
+        if backend is not None and backend not in RASTERIZER_BACKENDS:
+            raise ValueError(f"Backend di rasterizzazione non supportato: {backend}")
+
+        self.poppler_path = poppler_path
+        self.backend = backend or ('pdfium' if pdfium_available() else 'poppler')
+
+    def page_count(self, pdf_path: str) -> int:
+        if self.backend == 'pdfium':
+            import pypdfium2 as pdfium
+
+            with PDFIUM_LOCK:
+                document = pdfium.PdfDocument(pdf_path)
+                try:
+                    return len(document)
+                finally:
+                    document.close()
+
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    def render_page(
+        self,
+        pdf_path: str,
+        page_number: int,
+        dpi: int = 300,
+        grayscale: bool = False
+    ) -> Optional['np.ndarray']:
+        """Renderizza la pagina (numerata da 1) in un array contiguo e scrivibile
+
+        None se la pagina è vuota o mancante.
+        """
+        if self.backend == 'pdfium':
+            try:
+                return self._render_pdfium(pdf_path, page_number, dpi, grayscale)
+            except Exception as e:
+                logger.warning(f"Rendering PDFium fallito per la pagina {page_number}, uso Poppler: {e}")
+
+        return self._render_poppler(pdf_path, page_number, dpi, grayscale)
+
+    def _render_pdfium(self, pdf_path: str, page_number: int, dpi: int, grayscale: bool) -> 'np.ndarray':
+        import pypdfium2 as pdfium
+
+        # Buffer allocato da Python e senza padding di riga: l'array NumPy lo
+        # possiede e resta valido dopo la chiusura del documento (nessuna copia)
+        bitmap_maker = functools.partial(pdfium.PdfBitmap.new_foreign, force_packed=True)
+
+        with PDFIUM_LOCK:
+            document = pdfium.PdfDocument(pdf_path)
+            try:
+                page = document[page_number - 1]
+                try:
+                    # rev_byteorder: RGB invece del BGR nativo di PDFium (come pdf2image/PIL)
+                    bitmap = page.render(
+                        scale=dpi / 72,
+                        grayscale=grayscale,
+                        rev_byteorder=not grayscale,
+                        bitmap_maker=bitmap_maker
+                    )
+                    return bitmap.to_numpy()
+                finally:
+                    page.close()
+            finally:
+                document.close()
+
+    def _render_poppler(self, pdf_path: str, page_number: int, dpi: int, grayscale: bool) -> Optional['np.ndarray']:
+        import numpy as np
+        from pdf2image import convert_from_path
+
+        images = convert_from_path(
+            pdf_path,
+            poppler_path=self.poppler_path,
+            dpi=dpi,
+            first_page=page_number,
+            last_page=page_number,
+            grayscale=grayscale
+        )
+        if not images:
+            return None
+        return np.array(images[0].convert('L' if grayscale else 'RGB'))
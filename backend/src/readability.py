@@ -0,0 +1,87 @@
+import re
+from typing import Any, Dict, Iterable
+
+from .sentences import iter_sentence_spans
+
+# Parole: sequenze di lettere con almeno una vocale (le elisioni come "l'"
+# e le sigle senza vocali non contano come parole)
+_WORD = re.compile(r"[^\W\d_]*[aeiouyàèéìíîòóùú][^\W\d_]*", re.IGNORECASE)
+
+# Nuclei sillabici: gruppi di vocali consecutive...
+_VOWEL_GROUP = re.compile(r"[aeiouyàèéìíîòóùú]+", re.IGNORECASE)
+# ...più uno per ogni iato tra vocali forti (po-e-ta, pa-e-se)
+_HIATUS = re.compile(r"(?=[aeoàèéòó][aeoàèéòó])", re.IGNORECASE)
+
+# Velocità di lettura di riferimento per lettori con DSA (parole al minuto)
+READING_WORDS_PER_MINUTE = 200
+
+class TextStatistics:
+    """Conteggi di lettere, parole, sillabe e frasi di un testo
+
+    I conteggi si accumulano frase per frase (add_text, add_sentence) e si
+    sommano tra sezioni, quindi gli indici del documento e delle singole
+    sezioni derivano dalla stessa passata sul testo.
+    """
+
+    __slots__ = ('letters', 'words', 'syllables', 'sentences')
+
+    def __init__(self):
+        self.letters = 0
+        self.words = 0
+        self.syllables = 0
+        self.sentences = 0
+
+    def add_sentence(self, sentence: str):
+        words = _WORD.findall(sentence)
+        if not words:
+            return
+        self.sentences += 1
+        self.words += len(words)
+        self.letters += sum(map(len, words))
+        self.syllables += len(_VOWEL_GROUP.findall(sentence)) + len(_HIATUS.findall(sentence))
+
+    def add_text(self, text: str):
+        for start, end in iter_sentence_spans(text):
+            self.add_sentence(text[start:end])
+
+    def __iadd__(self, other: 'TextStatistics') -> 'TextStatistics':
+        self.letters += other.letters
+        self.words += other.words
+        self.syllables += other.syllables
+        self.sentences += other.sentences
+        return self
+
+    @classmethod
+    def total(cls, parts: Iterable['TextStatistics']) -> 'TextStatistics':
+        result = cls()
+        for part in parts:
+            result += part
+        return result
+
+    def gulpease(self) -> float:
+        """Indice Gulpease (0-100, più alto = più facile): 89 + (300 frasi - 10 lettere) / parole"""
+        if not self.words:
+            return 0.0
+        score = 89 + (300 * self.sentences - 10 * self.letters) / self.words
+        return round(max(0.0, min(100.0, score)), 1)
+
+    def flesch_vacca(self) -> float:
+        """Flesch adattato all'italiano (Franchina-Vacca): 206 - 65 sillabe/parola - parole/frase"""
+        if not self.words:
+            return 0.0
+        score = 206 - 65 * self.syllables / self.words - self.words / self.sentences
+        return round(max(0.0, min(100.0, score)), 1)
+
+    def reading_minutes(self) -> int:
+        return max(1, self.words // READING_WORDS_PER_MINUTE)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'words': self.words,
+            'sentences': self.sentences,
+            'syllables': self.syllables,
+            'letters': self.letters,
+            'gulpease': self.gulpease(),
+            'flesch_vacca': self.flesch_vacca(),
+            'reading_minutes': self.reading_minutes(),
+        }
@@ -0,0 +1,138 @@
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Abbreviazioni dopo le quali il punto non chiude la frase (minuscole, senza punto finale)
+ABBREVIATIONS = frozenset({
+    # Titoli e professioni
+    'sig', 'sigg', 'sig.ra', 'sig.na', 'dott', 'dott.ssa', 'dr', 'prof', 'prof.ssa',
+    'ing', 'avv', 'arch', 'geom', 'rag', 'sen', 'mons', 'gent', 'egr', 'spett',
+    # Rimandi e citazioni
+    'pag', 'pagg', 'p', 'pp', 'cap', 'capp', 'art', 'artt', 'par', 'vol', 'voll',
+    'n', 'nn', 'fig', 'figg', 'tab', 'tav', 'es', 'cfr', 'cit', 'op', 'ibid', 'id',
+    'vd', 'v', 'sez', 'sg', 'sgg', 'seg', 'segg', 'a.c', 'd.c', 'ca', 'c.a',
+    'tel', 'fax', 'nr', 'max', 'ss',
+    # Mesi
+    'gen', 'feb', 'mar', 'apr', 'mag', 'giu', 'lug', 'sett', 'ott', 'nov', 'dic',
+    # Inglese
+    'mr', 'mrs', 'ms', 'st', 'vs', 'e.g', 'i.e', 'jr', 'sr',
+})
+
+# Abbreviazioni che sono anche parole comuni ("di no.", "l'ago."): non
+# chiudono la frase solo se seguite da un numero ("no. 5", "ago. 2024")
+NUMERIC_ABBREVIATIONS = frozenset({'no', 'ago', 'min', 'ed'})
+
+# Abbreviazioni che chiudono la frase se la parola successiva è maiuscola
+TERMINAL_ABBREVIATIONS = frozenset({'ecc', 'etc'})
+
+# Punteggiatura finale, eventuali chiusure (virgolette, parentesi) e spazio
+# successivo; in alternativa un cambio di paragrafo
+_BOUNDARY = re.compile(r'[.!?…]+["\'»”’)\]]*(?=\s|$)|\n[ \t]*\n')
+
+# Parola (anche puntata, come "a.C" o "dott.ssa") che precede il punto
+_LAST_TOKEN = re.compile(r'(\w+(?:\.\w+)*)$')
+
+# Finestra all'indietro in cui cercare la parola prima del punto: lavoro
+# costante per candidato, quindi segmentazione lineare nella lunghezza del testo
+_TOKEN_WINDOW = 24
+
+def _is_boundary(text: str, start: int, end: int) -> bool:
+    """Decide se la punteggiatura in text[start:end] chiude la frase"""
+    if text[start] == '\n' or text[start] != '.' or text[end - 1] != '.':
+        # Paragrafo, ! ? … oppure punto seguito da chiusure: fine frase
+        return True
+
+    following = _next_text(text, end)
+    if following < len(text) and text[following].islower():
+        return False
+
+    match = _LAST_TOKEN.search(text, max(0, start - _TOKEN_WINDOW), start)
+    if not match:
+        return True
+    token = match.group(1)
+    lowered = token.lower()
+    if lowered in ABBREVIATIONS:
+        return False
+    if lowered in NUMERIC_ABBREVIATIONS:
+        return not (following < len(text) and text[following].isdigit())
+    if lowered in TERMINAL_ABBREVIATIONS:
+        return following < len(text) and text[following].isupper()
+    # Iniziale puntata ("G. Verdi"), ma non numeri ("nel 1990. Poi")
+    return not (len(token) == 1 and token.isalpha() and token.isupper())
+
+def _next_text(text: str, index: int) -> int:
+    """Primo carattere non spaziato da index in poi, len(text) se non c'è"""
+    while index < len(text) and text[index].isspace():
+        index += 1
+    return index
+
+def iter_sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """Intervalli (inizio, fine) delle frasi di text, senza spazi ai bordi
+
+    Una sola passata sul testo: ogni carattere è esaminato un numero
+    costante di volte.
+    """
+    position = 0
+    for match in _BOUNDARY.finditer(text):
+        if not _is_boundary(text, match.start(), match.end()):
+            continue
+        span = _strip_span(text, position, match.end())
+        if span:
+            yield span
+        position = match.end()
+
+    span = _strip_span(text, position, len(text))
+    if span:
+        yield span
+
+def _strip_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+def split_sentences(text: str) -> List[str]:
+    return [text[start:end] for start, end in iter_sentence_spans(text)]
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+    """Frasi di un testo che arriva a blocchi, come (inizio, fine, frase)
+
+    Gli offset si riferiscono al testo complessivo. L'ultima frase di ogni
+    blocco può continuare nel successivo e resta in attesa fino al blocco
+    dopo (o alla fine del testo). Ogni blocco riprende la ricerca da dove
+    si era fermato il precedente: il testo in attesa non è riletto.
+    """
+    pending = ''
+    offset = 0
+    # Posizione in pending da cui riprendere la ricerca della punteggiatura
+    scan = 0
+    for chunk in chunks:
+        pending += chunk
+        position = 0
+        for match in _BOUNDARY.finditer(pending, scan):
+            # Punteggiatura in fondo al testo ricevuto: può continuare nel
+            # blocco successivo, e il punto si valuta sulla parola che segue
+            if _next_text(pending, match.end()) == len(pending):
+                scan = match.start()
+                break
+            scan = match.end()
+            if _is_boundary(pending, match.start(), match.end()):
+                span = _strip_span(pending, position, match.end())
+                if span:
+                    yield offset + span[0], offset + span[1], pending[span[0]:span[1]]
+                position = match.end()
+        else:
+            # Nessun candidato in sospeso: si riparte dalla fine, tranne un a
+            # capo finale che col blocco successivo può chiudere il paragrafo
+            tail = len(pending)
+            while tail > scan and pending[tail - 1] in ' \t':
+                tail -= 1
+            scan = tail - 1 if tail > scan and pending[tail - 1] == '\n' else len(pending)
+
+        if position:
+            pending = pending[position:]
+            offset += position
+            scan -= position
+
+    for start, end in iter_sentence_spans(pending):
+        yield offset + start, offset + end, pending[start:end]
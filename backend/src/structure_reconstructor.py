@@ -1,7 +1,13 @@
+import asyncio
 import re
 from typing import Dict, List, Any, Optional
 import logging
 
+from .cancellation import CancelToken, JobCancelledError
+from .models import OCRPageInfo
+from .ocr_layout import LOW_CONFIDENCE
+from .readability import TextStatistics
+
 logger = logging.getLogger(__name__)
 
 class StructureReconstructor:
@@ -43,32 +49,62 @@ class StructureReconstructor:
             re.compile(r'^\s*\[\d+\]\s*(.+)$', re.MULTILINE),
         ]
     
-    async def reconstruct_structure(self, text: str) -> Dict[str, Any]:
-        """Ricostruisce la struttura del documento"""
+    async def reconstruct_structure(
+        self,
+        text: str,
+        ocr_pages: Optional[List[OCRPageInfo]] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> Dict[str, Any]:
+        """Ricostruisce la struttura del documento
+        
+        Per i documenti OCR i titoli riconosciuti dal layout (altezza dei
+        caratteri) si aggiungono a quelli dedotti dal testo. L'analisi gira in
+        un thread per non bloccare il loop.
+        """
+        return await asyncio.to_thread(self._reconstruct_structure, text, ocr_pages, cancel_token)
+    
+    def _reconstruct_structure(
+        self,
+        text: str,
+        ocr_pages: Optional[List[OCRPageInfo]],
+        cancel_token: Optional[CancelToken]
+    ) -> Dict[str, Any]:
         try:
             logger.info("Inizio ricostruzione struttura")
             
             # Divide il testo in righe
             lines = text.split('\n')
+            layout_headings = self._layout_headings(ocr_pages or [])
+            sections = self._extract_sections(lines, layout_headings)
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            statistics = self._text_statistics(lines, sections)
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
             
             # Analizza la struttura
             structure = {
                 'title': self._extract_title(lines),
-                'sections': self._extract_sections(lines),
+                'sections': sections,
                 'paragraphs': self._extract_paragraphs(lines),
                 'lists': self._extract_lists(lines),
                 'quotes': self._extract_quotes(lines),
                 'notes': self._extract_notes(lines),
                 'metadata': {
                     'total_lines': len(lines),
-                    'estimated_reading_time': self._estimate_reading_time(text),
-                    'complexity_score': self._calculate_complexity_score(text)
+                    'estimated_reading_time': statistics.reading_minutes(),
+                    'complexity_score': self._calculate_complexity_score(statistics),
+                    'readability': statistics.to_dict()
                 }
             }
+            if ocr_pages:
+                structure['metadata']['ocr'] = self._ocr_quality(ocr_pages)
             
             logger.info("Ricostruzione struttura completata")
             return structure
             
+        except JobCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Errore nella ricostruzione struttura: {e}")
             raise
@@ -88,7 +124,34 @@ class StructureReconstructor:
         
         return None
     
-    def _extract_sections(self, lines: List[str]) -> List[Dict[str, Any]]:
+    def _layout_headings(self, ocr_pages: List[OCRPageInfo]) -> Dict[str, int]:
+        """Livello dei titoli individuati dal layout OCR, indicizzati per testo normalizzato"""
+        headings = {}
+        for page in ocr_pages:
+            if page.layout is None:
+                continue
+            for hint in page.layout.structure_hints():
+                key = self._line_key(hint['text'])
+                if key:
+                    headings.setdefault(key, hint['level'])
+        return headings
+    
+    def _line_key(self, line: str) -> str:
+        """Chiave di confronto tra righe OCR e testo normalizzato (solo lettere e cifre)"""
+        return ''.join(char for char in line.lower() if char.isalnum())
+    
+    def _ocr_quality(self, ocr_pages: List[OCRPageInfo]) -> Dict[str, Any]:
+        """Confidenza OCR del documento e pagine poco affidabili"""
+        scored = [page for page in ocr_pages if page.confidence is not None]
+        words = sum(page.word_count for page in scored)
+        mean = sum(page.confidence * page.word_count for page in scored) / words if words else None
+        return {
+            'mean_confidence': round(mean, 1) if mean is not None else None,
+            'page_confidence': {page.page_number: page.confidence for page in scored},
+            'low_confidence_pages': [page.page_number for page in scored if page.confidence < LOW_CONFIDENCE],
+        }
+    
+    def _extract_sections(self, lines: List[str], layout_headings: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
         """Estrae le sezioni/titoli del documento"""
         sections = []
         current_section = None
@@ -99,7 +162,7 @@ class StructureReconstructor:
                 continue
             
             # Controlla se la riga è un titolo
-            title_match = self._is_title(line, lines, i)
+            title_match = self._is_title(line, lines, i, layout_headings)
             if title_match:
                 # Salva la sezione precedente
                 if current_section:
@@ -122,7 +185,13 @@ class StructureReconstructor:
         
         return sections
     
-    def _is_title(self, line: str, all_lines: List[str], line_index: int) -> Optional[Dict[str, Any]]:
+    def _is_title(
+        self,
+        line: str,
+        all_lines: List[str],
+        line_index: int,
+        layout_headings: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Determina se una riga è un titolo e restituisce le informazioni"""
         # Controlla pattern di numerazione
         for pattern in self.title_patterns[:3]:  # Solo pattern numerici
@@ -135,6 +204,16 @@ class StructureReconstructor:
                     'type': 'numbered'
                 }
         
+        # Titoli riconosciuti dal layout OCR (caratteri più grandi del corpo)
+        if layout_headings:
+            level = layout_headings.get(self._line_key(line))
+            if level:
+                return {
+                    'level': level,
+                    'title': line,
+                    'type': 'layout'
+                }
+        
         # Controlla titoli in maiuscolo (solo se brevi)
         if line.isupper() and 10 <= len(line) <= 80:
             return {
@@ -267,27 +346,37 @@ class StructureReconstructor:
         
         return notes
     
-    def _estimate_reading_time(self, text: str) -> int:
-        """Stima il tempo di lettura in minuti"""
-        # Assumendo 200 parole al minuto per lettori DSA
-        words = len(text.split())
-        return max(1, words // 200)
-    
-    def _calculate_complexity_score(self, text: str) -> float:
-        """Calcola un punteggio di complessità del testo (0-1)"""
-        words = text.split()
-        sentences = re.split(r'[.!?]+', text)
-        
-        if not words or not sentences:
-            return 0.0
+    def _text_statistics(self, lines: List[str], sections: List[Dict[str, Any]]) -> TextStatistics:
+        """Conteggi di leggibilità del documento e di ogni sezione in un'unica passata
         
-        # Lunghezza media delle parole
-        avg_word_length = sum(len(word) for word in words) / len(words)
+        Il testo di ogni sezione (titolo escluso) è segmentato in frasi una
+        sola volta; gli indici del documento sono la somma delle sezioni.
+        """
+        starts = {section['line_number']: section for section in sections}
+        parts = []
+        current = None
+        segment = []
         
-        # Lunghezza media delle frasi
-        avg_sentence_length = len(words) / len(sentences)
+        def flush():
+            statistics = TextStatistics()
+            statistics.add_text('\n'.join(segment))
+            if current is not None:
+                current['readability'] = statistics.to_dict()
+            parts.append(statistics)
         
-        # Punteggio di complessità (normalizzato)
-        complexity = (avg_word_length / 10.0 + avg_sentence_length / 20.0) / 2.0
+        for i, line in enumerate(lines):
+            if i in starts:
+                flush()
+                current = starts[i]
+                segment = []
+            else:
+                segment.append(line)
+        flush()
         
-        return min(1.0, max(0.0, complexity))
+        return TextStatistics.total(parts)
+    
+    def _calculate_complexity_score(self, statistics: TextStatistics) -> float:
+        """Punteggio di complessità del testo (0-1) derivato dall'indice Gulpease"""
+        if not statistics.words:
+            return 0.0
+        return round(1 - statistics.gulpease() / 100, 2)
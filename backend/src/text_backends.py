@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Type
+import logging
+
+from .rasterizer import PDFIUM_LOCK, pdfium_available
+
+logger = logging.getLogger(__name__)
+
+class TextBackend(ABC):
+    """Motore di estrazione del testo nativo
+
+    Contratto comune a tutti i backend: il testo di ogni pagina richiesta,
+    nell'ordine, con righe separate da '\\n' e '' per le pagine senza testo.
+    La pipeline unisce poi le pagine con una riga vuota.
+    """
+
+    name = ''
+    # Pagine oltre le quali conviene distribuire l'estrazione su più processi
+    parallel_min_pages = 16
+
+    @abstractmethod
+    def iter_pages(self, pdf_path: str, first_page: int, last_page: int) -> Iterator[str]:
+        """Testo delle pagine da first_page a last_page (numerate da 1, incluse)"""
+
+    def extract_pages(self, pdf_path: str, first_page: int, last_page: int) -> List[str]:
+        return list(self.iter_pages(pdf_path, first_page, last_page))
+
+class PdfiumTextBackend(TextBackend):
+    """Testo dal text layer via PDFium (compilato, ordini di grandezza più veloce di pdfminer)"""
+
+    name = 'pdfium'
+    # ~2 ms per pagina: l'avvio dei processi si ripaga solo su documenti molto lunghi
+    parallel_min_pages = 500
+
+    def iter_pages(self, pdf_path: str, first_page: int, last_page: int) -> Iterator[str]:
+        import pypdfium2 as pdfium
+
+        with PDFIUM_LOCK:
+            document = pdfium.PdfDocument(pdf_path)
+        try:
+            for index in range(first_page - 1, last_page):
+                with PDFIUM_LOCK:
+                    page = document[index]
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_bounded()
+                    finally:
+                        textpage.close()
+                        page.close()
+                # PDFium usa \r\n e segna con \x02 i trattini di sillabazione a fine riga
+                yield text.replace('\r\n', '\n').replace('\x02', '-')
+        finally:
+            with PDFIUM_LOCK:
+                document.close()
+
+class PdfplumberTextBackend(TextBackend):
+    """Testo via pdfplumber/pdfminer, quando serve il dettaglio del layout per carattere"""
+
+    name = 'pdfplumber'
+
+    def iter_pages(self, pdf_path: str, first_page: int, last_page: int) -> Iterator[str]:
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages[first_page - 1:last_page]:
+                text = page.extract_text() or ''
+                # Libera subito oggetti e layout della pagina
+                page.close()
+                yield text
+
+TEXT_BACKENDS: Dict[str, Type[TextBackend]] = {
+    'pdfium': PdfiumTextBackend,
+    'pdfplumber': PdfplumberTextBackend,
+}
+
+def default_text_backend() -> str:
+    return 'pdfium' if pdfium_available() else 'pdfplumber'
+
+def get_text_backend(name: Optional[str] = None) -> TextBackend:
+    """Istanza del backend richiesto (None: il più veloce disponibile)"""
+    name = name or default_text_backend()
+    if name not in TEXT_BACKENDS:
+        raise ValueError(f"Backend di estrazione testo non supportato: {name}")
+    return TEXT_BACKENDS[name]()
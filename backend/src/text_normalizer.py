@@ -1,8 +1,11 @@
+import asyncio
 import re
-import ftfy
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
+from .cancellation import CancelToken, JobCancelledError
+from .sentences import split_sentences
+
 logger = logging.getLogger(__name__)
 
 class TextNormalizer:
@@ -38,25 +41,36 @@ class TextNormalizer:
         # Pattern per spazi all'inizio della riga
         self.leading_spaces_pattern = re.compile(r'^[ \t]+', re.MULTILINE)
     
-    async def normalize_text(self, text: str) -> str:
-        """Normalizza il testo per la leggibilità DSA"""
+    async def normalize_text(self, text: str, cancel_token: Optional[CancelToken] = None) -> str:
+        """Normalizza il testo per la leggibilità DSA
+        
+        Il lavoro è tutto CPU: gira in un thread, così il loop resta libero
+        (annullamento, eventi SSE, /health) e cancel_token può scattare a metà.
+        """
+        return await asyncio.to_thread(self._normalize_text, text, cancel_token)
+    
+    def _normalize_text(self, text: str, cancel_token: Optional[CancelToken]) -> str:
         try:
             logger.info("Inizio normalizzazione testo")
             
             # 1. Fix encoding issues
+            import ftfy
             text = ftfy.fix_text(text)
+            self._check_cancelled(cancel_token)
             
             # 2. Rimuovi caratteri di controllo
             text = self.control_chars_pattern.sub('', text)
             
             # 3. Unisci sillabazioni
             text = self._fix_hyphenations(text)
+            self._check_cancelled(cancel_token)
             
             # 4. Sostituisci legature
             text = self._fix_ligatures(text)
             
             # 5. Normalizza spazi
             text = self._normalize_spaces(text)
+            self._check_cancelled(cancel_token)
             
             # 6. Normalizza righe vuote
             text = self._normalize_newlines(text)
@@ -64,6 +78,7 @@ class TextNormalizer:
             # 7. Pulisci spazi finali e iniziali
             text = self.trailing_spaces_pattern.sub('', text)
             text = self.leading_spaces_pattern.sub('', text)
+            self._check_cancelled(cancel_token)
             
             # 8. Normalizza punteggiatura
             text = self._normalize_punctuation(text)
@@ -71,10 +86,17 @@ class TextNormalizer:
             logger.info("Normalizzazione testo completata")
             return text.strip()
             
+        except JobCancelledError:
+            raise
         except Exception as e:
             logger.error(f"Errore nella normalizzazione: {e}")
             raise
     
+    def _check_cancelled(self, cancel_token: Optional[CancelToken]):
+        """Interrompe la normalizzazione se il job è stato annullato"""
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+    
     def _fix_hyphenations(self, text: str) -> str:
         """Unisce le sillabazioni spezzate su più righe"""
         # Pattern per sillabazioni comuni
@@ -136,38 +158,9 @@ class TextNormalizer:
         
         return text
     
-    def _detect_language(self, text: str) -> str:
-        """Rileva la lingua del testo (semplificato)"""
-        # Conta caratteri italiani comuni
-        italian_chars = len(re.findall(r'[àèéìíîòóùú]', text, re.IGNORECASE))
-        english_chars = len(re.findall(r'[th]', text, re.IGNORECASE))
-        
-        if italian_chars > english_chars:
-            return 'ita'
-        else:
-            return 'eng'
-    
     def _split_into_sentences(self, text: str) -> List[str]:
-        """Divide il testo in frasi"""
-        # Pattern per fine frase
-        sentence_endings = re.compile(r'[.!?]+\s+')
-        
-        sentences = sentence_endings.split(text)
-        
-        # Ricostruisci le frasi con la punteggiatura
-        result = []
-        for i, sentence in enumerate(sentences):
-            if sentence.strip():
-                # Aggiungi la punteggiatura se non è l'ultima frase
-                if i < len(sentences) - 1:
-                    # Trova la punteggiatura originale
-                    match = re.search(r'[.!?]+', text[text.find(sentence):])
-                    if match:
-                        sentence += match.group()
-                
-                result.append(sentence.strip())
-        
-        return result
+        """Divide il testo in frasi (abbreviazioni italiane e inglesi comprese)"""
+        return split_sentences(text)
     
     def _clean_paragraphs(self, text: str) -> str:
         """Pulisce e normalizza i paragrafi"""
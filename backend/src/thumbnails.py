@@ -0,0 +1,149 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+
+from . import metrics
+from .rasterizer import PageRasterizer
+
+logger = logging.getLogger(__name__)
+
+# Risoluzione di default delle miniature (~400 px di altezza per un A4)
+THUMBNAIL_DPI = 48
+THUMBNAIL_MIN_DPI = 12
+THUMBNAIL_MAX_DPI = 150
+
+THUMBNAIL_FORMATS = {'webp': 'image/webp', 'png': 'image/png'}
+
+# Spazio su disco massimo della cache delle miniature
+THUMBNAIL_CACHE_BYTES = 256 * 1024 * 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_HASHED_FILES = 4096
+
+def default_cache_dir() -> Path:
+    return Path(tempfile.gettempdir()) / 'pdf-dsa-converter' / 'thumbnails'
+
+class ThumbnailCache:
+    """Miniature delle pagine renderizzate a bassa risoluzione e salvate su disco
+
+    Le miniature sono indicizzate per hash del contenuto del PDF, pagina,
+    risoluzione e formato: restano valide se il file viene spostato e si
+    invalidano da sole se cambia. Oltre `max_bytes` si eliminano le meno
+    usate (data di modifica aggiornata a ogni lettura).
+    """
+
+    def __init__(self, rasterizer: PageRasterizer, cache_dir: Optional[Path] = None, max_bytes: int = THUMBNAIL_CACHE_BYTES):
+        self.rasterizer = rasterizer
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (percorso, dimensione, data di modifica) -> hash del contenuto
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._total_bytes: Optional[int] = None
+
+    def etag(self, pdf_path: str, page_number: int, dpi: int = THUMBNAIL_DPI, image_format: str = 'webp') -> str:
+        """ETag della miniatura, calcolabile senza renderizzarla"""
+        return f'"{self._name(pdf_path, page_number, dpi, image_format)}"'
+
+    def get(self, pdf_path: str, page_number: int, dpi: int = THUMBNAIL_DPI, image_format: str = 'webp') -> Path:
+        """Percorso della miniatura, renderizzata se non è in cache; operazione bloccante"""
+        name = self._name(pdf_path, page_number, dpi, image_format)
+        path = self.cache_dir / name[:2] / name
+        if path.exists():
+            metrics.record_cache_access('thumbnail', True)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+        metrics.record_cache_access('thumbnail', False)
+        page_count = self.rasterizer.page_count(pdf_path)
+        if not 1 <= page_number <= page_count:
+            raise ValueError(f"Pagina {page_number} fuori dal documento ({page_count} pagine)")
+        self._store(path, self._render(pdf_path, page_number, self._clamp_dpi(dpi), image_format))
+        return path
+
+    def _name(self, pdf_path: str, page_number: int, dpi: int, image_format: str) -> str:
+        if image_format not in THUMBNAIL_FORMATS:
+            raise ValueError(f"Formato miniatura non supportato: {image_format}")
+        return f"{self.file_hash(pdf_path)}-{page_number}-{self._clamp_dpi(dpi)}.{image_format}"
+
+    def _clamp_dpi(self, dpi: int) -> int:
+        return max(THUMBNAIL_MIN_DPI, min(THUMBNAIL_MAX_DPI, dpi))
+
+    def file_hash(self, pdf_path: str) -> str:
+        """SHA-256 del contenuto, ricalcolato solo se il file cambia"""
+        stat = os.stat(pdf_path)
+        key = (os.path.realpath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._file_hashes.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(pdf_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+            if len(self._file_hashes) >= MAX_HASHED_FILES:
+                self._file_hashes.clear()
+            digest = self._file_hashes[key] = sha.hexdigest()
+        return digest
+
+    def _render(self, pdf_path: str, page_number: int, dpi: int, image_format: str) -> bytes:
+        from PIL import Image
+
+        image = self.rasterizer.render_page(pdf_path, page_number, dpi=dpi)
+        if image is None:
+            raise ValueError(f"Pagina {page_number} non disponibile")
+
+        buffer = io.BytesIO()
+        if image_format == 'webp':
+            Image.fromarray(image).save(buffer, format='WEBP', quality=80, method=4)
+        else:
+            Image.fromarray(image).save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+
+    def _store(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Scrittura atomica: un lettore concorrente non vede mai un file parziale
+        tmp_path = path.with_suffix(f"{path.suffix}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for folder in self.cache_dir.iterdir():
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        """Elimina le miniature meno usate fino a scendere al 90% del limite"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        target = self.max_bytes * 0.9
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for entry_path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        logger.info(f"Cache miniature: rimosse {evicted} miniature ({total / (1024 * 1024):.1f} MB in uso)")
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Limite di span per job: un documento di migliaia di pagine resta in memoria limitata
+MAX_TRACE_EVENTS = 50000
+
+class JobTrace:
+    """Timeline di un job (fasi e passi per pagina) in formato Chrome trace-event"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+        self.dropped_events = 0
+
+    def now(self) -> float:
+        """Istante corrente da usare come inizio di uno span"""
+        return time.perf_counter()
+
+    def add_span(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: Optional[float] = None,
+        worker: Optional[Tuple[int, int, str]] = None,
+        **args: Any
+    ):
+        """Registra uno span concluso, attribuito al thread corrente o a worker
+
+        worker (pid, tid, nome del thread) attribuisce lo span a un altro
+        processo: perf_counter usa un orologio di sistema, quindi gli istanti
+        misurati nei processi del pool sono confrontabili con quelli del job.
+        """
+        end = end if end is not None else time.perf_counter()
+        if worker is None:
+            thread = threading.current_thread()
+            worker = (os.getpid(), thread.ident, thread.name)
+        pid, tid, thread_name = worker
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self._origin) * 1_000_000, 1),
+            'dur': round((end - start) * 1_000_000, 1),
+            'pid': pid,
+            'tid': tid,
+            'args': args,
+        }
+        with self._lock:
+            if len(self._events) >= MAX_TRACE_EVENTS:
+                self.dropped_events += 1
+                return
+            self._events.append(event)
+            self._thread_names.setdefault((pid, tid), thread_name)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[None]:
+        """Misura il blocco come span della timeline"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, **args)
+
+    def to_chrome_trace(self, process_name: str = 'pdf-processor') -> Dict[str, Any]:
+        """Esporta la timeline (apribile in chrome://tracing o Perfetto)"""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+
+        main_pid = os.getpid()
+        metadata = [
+            {
+                'name': 'process_name', 'ph': 'M', 'pid': pid,
+                'args': {'name': process_name if pid == main_pid else f"{process_name} (worker {pid})"},
+            }
+            for pid in sorted({main_pid} | {pid for pid, _ in thread_names})
+        ]
+        metadata.extend(
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+            for (pid, tid), name in thread_names.items()
+        )
+        return {
+            'traceEvents': metadata + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'started_at': self.started_at,
+                'dropped_events': self.dropped_events,
+            },
+        }
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from src.pdf_processor import PDFProcessor
+
+# Pagina A4 a 300 dpi
+PAGE_SIZE = (2480, 3508)
+LINE = "Il testo della pagina con parole lunghe e corte, fino al margine destro."
+
+@pytest.fixture(scope='module')
+def processor():
+    return PDFProcessor()
+
+def text_page(points: int, gray: int, noise: float = 0, lines: int = 5) -> np.ndarray:
+    image = Image.new('L', PAGE_SIZE, 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=round(points * 300 / 72))
+    for line in range(lines):
+        draw.text((300, 400 + line * 60), LINE, fill=gray, font=font)
+    page = np.array(image)
+    if noise:
+        rng = np.random.default_rng(42)
+        page = np.clip(page + rng.normal(0, noise, page.shape), 0, 255).astype(np.uint8)
+    return page
+
+def ink_box(page: np.ndarray):
+    rows = np.flatnonzero((page < 255).any(axis=1))
+    cols = np.flatnonzero((page < 255).any(axis=0))
+    return cols[0], rows[0], cols[-1] + 1, rows[-1] + 1
+
+@pytest.mark.parametrize('points, gray, noise', [
+    (10, 0, 0),
+    (10, 80, 0),
+    (12, 120, 0),
+    (8, 160, 0),
+    (10, 120, 12),
+])
+def test_bounds_contain_small_and_light_text(processor, points, gray, noise):
+    bounds = processor._content_bounds(text_page(points, gray, noise))
+    assert bounds is not None
+    x0, y0, x1, y1 = ink_box(text_page(points, gray))
+    assert bounds[0] <= x0 and bounds[1] <= y0
+    assert bounds[2] >= x1 and bounds[3] >= y1
+
+def test_dense_noisy_page_is_cropped(processor):
+    # Testo fitto: l'inchiostro saturo a 0 non deve passare per il colore della carta
+    page = text_page(12, 0, noise=12, lines=48)
+    x0, y0, x1, y1 = ink_box(text_page(12, 0, lines=48))
+    bounds = processor._content_bounds(page)
+    assert bounds[0] <= x0 and bounds[1] <= y0
+    assert bounds[2] >= x1 and bounds[3] >= y1
+    assert bounds != (0, 0, *PAGE_SIZE)
+
+def test_noisy_blank_page_is_blank(processor):
+    rng = np.random.default_rng(42)
+    page = np.clip(245 + rng.normal(0, 12, PAGE_SIZE[::-1]), 0, 255).astype(np.uint8)
+    page[3000:3003, 2200:2203] = 0
+    assert processor._content_bounds(page) is None
+
+def test_dark_background_keeps_full_page(processor):
+    page = np.full(PAGE_SIZE[::-1], 90, np.uint8)
+    assert processor._content_bounds(page) == (0, 0, *PAGE_SIZE)
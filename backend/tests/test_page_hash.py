@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from src.page_hash import PageHashIndex, fingerprint
+
+def scanned_page(page_number: int, noise: float = 0, seed: int = 0, shift: int = 0) -> np.ndarray:
+    image = Image.new('L', (1100, 2900), 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=42)
+    for line in range(40):
+        draw.text((40 + shift, 40 + shift + line * 60), f"testo della riga {line} con parole della pagina", fill=0, font=font)
+    draw.text((500 + shift, 2800 + shift), f"- {page_number} -", fill=0, font=font)
+    page = np.array(image)
+    if noise:
+        rng = np.random.default_rng(seed)
+        page = np.clip(page + rng.normal(0, noise, page.shape), 0, 255).astype(np.uint8)
+    return page
+
+@pytest.fixture
+def index():
+    index = PageHashIndex()
+    index.add(fingerprint(scanned_page(1, noise=12)), 'pagina 1')
+    return index
+
+def test_rescanned_page_is_reused(index):
+    assert index.find(fingerprint(scanned_page(1, noise=12, seed=1, shift=3))) == 'pagina 1'
+
+@pytest.mark.parametrize('page_number', [4, 7, 11])
+def test_different_page_number_is_not_reused(index, page_number):
+    assert index.find(fingerprint(scanned_page(page_number, noise=12, seed=1))) is None
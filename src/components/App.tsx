@@ -4,13 +4,13 @@ import { ProcessingQueue } from './ProcessingQueue'
 import { SettingsPanel } from './SettingsPanel'
 import { DSAProfile, ProcessingJob } from '@/types'
 import { getDefaultProfile } from '@/utils/dsaProfiles'
-import { apiService, ProcessingOptions } from '@/utils/api'
+import { apiService, JobEvent, ProcessingOptions } from '@/utils/api'
 
 export default function App() {
   const [jobs, setJobs] = useState<ProcessingJob[]>([])
   const [selectedProfile, setSelectedProfile] = useState<DSAProfile>(getDefaultProfile())
   const [outputDirectory, setOutputDirectory] = useState<string>('')
-  const [outputFormats, setOutputFormats] = useState<('docx' | 'pdf' | 'epub')[]>(['docx'])
+  const [outputFormats, setOutputFormats] = useState<('docx' | 'pdf' | 'epub' | 'html')[]>(['docx'])
   const [isProcessing, setIsProcessing] = useState(false)
   const [apiConnected, setApiConnected] = useState(false)
 
@@ -51,46 +51,46 @@ export default function App() {
       dsa_profile: selectedProfile,
       output_formats: outputFormats,
       output_directory: outputDirectory,
-      ocr_language: 'ita+eng',
+      ocr_language: 'auto',
       enable_deskew: true,
       enable_denoise: true
     }
 
     try {
-      // Processa ogni job
-      for (const job of jobs) {
+      // Avvia tutti i file come un unico batch, poi segui l'avanzamento con un solo stream push
+      const backendJobIds = new Map<string, string>()
+
+      setJobs(prev => prev.map(j => 
+        jobs.some(job => job.id === j.id) ? { ...j, status: 'processing' } : j
+      ))
+
+      try {
+        const result = await apiService.processBatch(jobs.map(job => job.filePath), options)
+        result.job_ids.forEach((backendId, index) => backendJobIds.set(backendId, jobs[index].id))
+      } catch (error) {
+        console.error('Errore nell\'avvio del batch:', error)
         setJobs(prev => prev.map(j => 
-          j.id === job.id ? { ...j, status: 'processing' } : j
+          jobs.some(job => job.id === j.id) ? { ...j, status: 'error', error: String(error) } : j
         ))
+      }
 
-        try {
-          // Crea un File object dal percorso (per ora simulato)
-          const file = new File([''], job.fileName, { type: 'application/pdf' })
-          
-          // Avvia il processing
-          const result = await apiService.processPDF(file, options)
-          
-          // Polling per lo stato del job
-          const pollJobStatus = async () => {
-            const status = await apiService.getJobStatus(result.job_id)
-            
-            setJobs(prev => prev.map(j => 
-              j.id === job.id ? { ...j, ...status } : j
-            ))
-
-            if (status.status === 'processing') {
-              setTimeout(pollJobStatus, 1000) // Poll ogni secondo
-            }
-          }
-          
-          pollJobStatus()
-          
-        } catch (error) {
-          console.error('Errore nel processing del job:', error)
+      if (backendJobIds.size > 0) {
+        apiService.subscribeToJobs([...backendJobIds.keys()], (event: JobEvent) => {
+          const localId = backendJobIds.get(event.job_id)
           setJobs(prev => prev.map(j => 
-            j.id === job.id ? { ...j, status: 'error', error: String(error) } : j
+            j.id === localId ? {
+              ...j,
+              status: event.status,
+              progress: event.progress,
+              stage: event.stage,
+              pagesDone: event.pages_done,
+              pagesTotal: event.pages_total,
+              pagesPerSecond: event.pages_per_second,
+              error: event.error ?? undefined,
+              outputFiles: event.output_files ?? undefined
+            } : j
           ))
-        }
+        })
       }
     } catch (error) {
       console.error('Errore durante il processing:', error)
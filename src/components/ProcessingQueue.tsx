@@ -28,6 +28,8 @@ export function ProcessingQueue({ jobs, onRemoveJob, onClearCompleted }: Process
         return 'Completato'
       case 'error':
         return 'Errore'
+      case 'cancelled':
+        return 'Annullato'
       case 'processing':
         return 'Elaborazione...'
       default:
@@ -111,6 +113,12 @@ export function ProcessingQueue({ jobs, onRemoveJob, onClearCompleted }: Process
                         {job.progress}%
                       </span>
                     )}
+                    {job.status === 'processing' && job.pagesTotal ? (
+                      <span className="text-xs text-gray-500">
+                        pag. {job.pagesDone ?? 0}/{job.pagesTotal}
+                        {job.pagesPerSecond ? ` · ${job.pagesPerSecond.toFixed(1)} pag/s` : ''}
+                      </span>
+                    ) : null}
                   </div>
                 </div>
               </div>
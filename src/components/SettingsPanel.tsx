@@ -8,8 +8,8 @@ interface SettingsPanelProps {
   onProfileChange: (profile: DSAProfile) => void
   outputDirectory: string
   onOutputDirectoryChange: (directory: string) => void
-  outputFormats: ('docx' | 'pdf' | 'epub')[]
-  onOutputFormatsChange: (formats: ('docx' | 'pdf' | 'epub')[]) => void
+  outputFormats: ('docx' | 'pdf' | 'epub' | 'html')[]
+  onOutputFormatsChange: (formats: ('docx' | 'pdf' | 'epub' | 'html')[]) => void
 }
 
 export function SettingsPanel({
@@ -31,7 +31,7 @@ export function SettingsPanel({
     }
   }, [onOutputDirectoryChange])
 
-  const handleFormatToggle = useCallback((format: 'docx' | 'pdf' | 'epub') => {
+  const handleFormatToggle = useCallback((format: 'docx' | 'pdf' | 'epub' | 'html') => {
     if (outputFormats.includes(format)) {
       onOutputFormatsChange(outputFormats.filter(f => f !== format))
     } else {
@@ -39,11 +39,12 @@ export function SettingsPanel({
     }
   }, [outputFormats, onOutputFormatsChange])
 
-  const getFormatLabel = (format: 'docx' | 'pdf' | 'epub') => {
+  const getFormatLabel = (format: 'docx' | 'pdf' | 'epub' | 'html') => {
     switch (format) {
       case 'docx': return 'Word (DOCX)'
       case 'pdf': return 'PDF'
       case 'epub': return 'ePub'
+      case 'html': return 'HTML (lettore)'
     }
   }
 
@@ -137,7 +138,7 @@ export function SettingsPanel({
         </div>
         
         <div className="space-y-3">
-          {(['docx', 'pdf', 'epub'] as const).map((format) => (
+          {(['docx', 'pdf', 'epub', 'html'] as const).map((format) => (
             <label
               key={format}
               className={`flex items-center space-x-3 p-3 border-2 rounded-xl cursor-pointer transition-all duration-200 ${
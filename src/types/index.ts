@@ -17,17 +17,21 @@ export interface ProcessingJob {
   id: string
   filePath: string
   fileName: string
-  status: 'pending' | 'processing' | 'completed' | 'error'
+  status: 'pending' | 'processing' | 'completed' | 'error' | 'cancelled'
   progress: number
+  stage?: string | null
+  pagesDone?: number
+  pagesTotal?: number
+  pagesPerSecond?: number | null
   error?: string
   outputFiles?: string[]
 }
 
 export interface ProcessingOptions {
   dsaProfile: DSAProfile
-  outputFormats: ('docx' | 'pdf' | 'epub')[]
+  outputFormats: ('docx' | 'pdf' | 'epub' | 'html')[]
   outputDirectory: string
-  ocrLanguage: 'ita' | 'eng' | 'ita+eng'
+  ocrLanguage: 'auto' | 'ita' | 'eng' | 'ita+eng'
   enableDeskew: boolean
   enableDenoise: boolean
 }
@@ -4,13 +4,56 @@ import { ProcessingJob, DSAProfile } from '@/types'
 
 export interface ProcessingOptions {
   dsa_profile: DSAProfile
-  output_formats: ('docx' | 'pdf' | 'epub')[]
+  output_formats: ('docx' | 'pdf' | 'epub' | 'html')[]
   output_directory: string
-  ocr_language: 'ita' | 'eng' | 'ita+eng'
+  ocr_language: 'auto' | 'ita' | 'eng' | 'ita+eng'
   enable_deskew: boolean
   enable_denoise: boolean
+  detect_orientation?: boolean
+  document_type?: 'auto' | 'single_column' | 'sparse_text' | 'slides'
+  crop_to_content?: boolean
+  detect_duplicates?: boolean
 }
 
+export interface JobEvent {
+  type: 'snapshot' | 'stage' | 'progress' | 'completed' | 'error' | 'cancelled'
+  job_id: string
+  file_name: string
+  status: ProcessingJob['status']
+  stage: string | null
+  progress: number
+  pages_done: number
+  pages_total: number
+  pages_per_second: number | null
+  stage_timings: Record<string, number>
+  error: string | null
+  output_files: string[] | null
+  timestamp: number
+}
+
+export interface ReaderChunkInfo {
+  title: string
+  level: number
+  continued: boolean
+  offset: number
+  size: number
+}
+
+export interface ReaderIndex {
+  title: string
+  size: number
+  css: string
+  chunks: ReaderChunkInfo[]
+}
+
+export interface ReaderChunks {
+  start: number
+  total: number
+  chunks: { id: number; title: string; level: number; html: string }[]
+}
+
+const JOB_EVENT_TYPES: JobEvent['type'][] = ['snapshot', 'stage', 'progress', 'completed', 'error', 'cancelled']
+
 class ApiService {
   private async request<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
     const url = `${API_BASE_URL}${endpoint}`
@@ -60,10 +103,116 @@ class ApiService {
     return await response.json()
   }
 
+  async processPDFPath(filePath: string, options: ProcessingOptions): Promise<{ job_id: string }> {
+    // Il backend gira sulla stessa macchina: passa il percorso invece di caricare il file
+    return this.request<{ job_id: string }>('/process-pdf-path', {
+      method: 'POST',
+      body: JSON.stringify({ file_path: filePath, options }),
+    })
+  }
+
+  async processBatch(filePaths: string[], options: ProcessingOptions): Promise<{ batch_id: string; job_ids: string[] }> {
+    // Un unico batch: il backend pianifica i file insieme e condivide motori e profili
+    return this.request<{ batch_id: string; job_ids: string[] }>('/process-batch', {
+      method: 'POST',
+      body: JSON.stringify({ file_paths: filePaths, options }),
+    })
+  }
+
+  async analyzePDFPath(filePath: string) {
+    return this.request<{
+      is_native: boolean
+      page_count: number
+      has_text: boolean
+      estimated_scan_quality: 'low' | 'medium' | 'high'
+    }>('/analyze-pdf-path', {
+      method: 'POST',
+      body: JSON.stringify({ file_path: filePath }),
+    })
+  }
+
+  async previewPDF(
+    filePath: string,
+    dsaProfile: DSAProfile,
+    options: { page?: number; pages?: number; ocr_language?: ProcessingOptions['ocr_language'] } = {}
+  ): Promise<string> {
+    // HTML delle prime pagine con il profilo scelto; cambiare profilo rigenera solo l'HTML
+    const response = await fetch(`${API_BASE_URL}/preview`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ file_path: filePath, dsa_profile: dsaProfile, ...options }),
+    })
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
+    }
+
+    return await response.text()
+  }
+
+  thumbnailUrl(filePath: string, page: number, options: { dpi?: number; format?: 'webp' | 'png' } = {}): string {
+    // URL stabile: il browser riusa la miniatura e la rivalida con l'ETag
+    const params = new URLSearchParams({ file_path: filePath, page: String(page) })
+    if (options.dpi) params.set('dpi', String(options.dpi))
+    if (options.format) params.set('format', options.format)
+    return `${API_BASE_URL}/thumbnail?${params}`
+  }
+
   async getJobStatus(jobId: string): Promise<ProcessingJob> {
     return this.request<ProcessingJob>(`/job-status/${jobId}`)
   }
 
+  /**
+   * Riceve in push (SSE) l'avanzamento dei job indicati, senza polling.
+   * Restituisce una funzione per chiudere lo stream.
+   */
+  subscribeToJobs(jobIds: string[], onEvent: (event: JobEvent) => void): () => void {
+    const source = new EventSource(`${API_BASE_URL}/events?job_ids=${jobIds.join(',')}`)
+
+    JOB_EVENT_TYPES.forEach(type => {
+      source.addEventListener(type, (message) => {
+        onEvent(JSON.parse((message as MessageEvent).data))
+      })
+    })
+
+    // Lo stream viene chiuso dal backend quando tutti i job sono terminati
+    source.onerror = () => source.close()
+
+    return () => source.close()
+  }
+
+  async exportJob(
+    jobId: string,
+    dsaProfile: DSAProfile,
+    outputFormats: ProcessingOptions['output_formats'],
+    outputDirectory: string
+  ): Promise<{ job_id: string; dsa_profile: string; output_files: string[] }> {
+    // Riesporta il contenuto già elaborato con un altro profilo, senza rifare OCR e struttura
+    return this.request(`/job/${jobId}/export`, {
+      method: 'POST',
+      body: JSON.stringify({ dsa_profile: dsaProfile, output_formats: outputFormats, output_directory: outputDirectory }),
+    })
+  }
+
+  async getReaderIndex(jobId: string): Promise<ReaderIndex> {
+    return this.request<ReaderIndex>(`/job/${jobId}/reader`)
+  }
+
+  async getReaderChunks(jobId: string, start: number, count?: number): Promise<ReaderChunks> {
+    // Solo i blocchi visibili: la prima pagina non dipende dalla lunghezza del documento
+    const params = new URLSearchParams({ start: String(start) })
+    if (count) params.set('count', String(count))
+    return this.request<ReaderChunks>(`/job/${jobId}/reader/chunks?${params}`)
+  }
+
+  async cancelJob(jobId: string) {
+    return this.request(`/job/${jobId}/cancel`, { method: 'POST' })
+  }
+
+  async cancelBatch(batchId: string) {
+    return this.request<{ job_ids: string[] }>(`/batch/${batchId}/cancel`, { method: 'POST' })
+  }
+
   async deleteJob(jobId: string) {
     return this.request(`/job/${jobId}`, { method: 'DELETE' })
   }